@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import dnsstamps
+from benchmarks.bench_memory import STAMPS
+from dnsstamps import aio
+
+COUNT = 100000
+INTERVAL = 0.001
+
+
+async def ticker(lags):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(INTERVAL)
+        lags.append(time.perf_counter() - start - INTERVAL)
+
+
+async def blocking(stamps):
+    return list(dnsstamps.parse_many(stamps))
+
+
+async def cooperative(stamps, executor=None):
+    return [parameter async for parameter in aio.parse_many(stamps, executor=executor)]
+
+
+async def measure(fn):
+    lags = []
+    task = asyncio.ensure_future(ticker(lags))
+    await asyncio.sleep(INTERVAL)
+    start = time.perf_counter()
+    await fn()
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(INTERVAL * 2)
+    task.cancel()
+    lags.sort()
+    return elapsed, lags[len(lags) // 2], lags[-1]
+
+
+async def run():
+    stamps = STAMPS * (COUNT // len(STAMPS))
+    print('%12s %10s %16s %14s' % ('method', 'time (s)', 'median lag (ms)', 'max lag (ms)'))
+    with ThreadPoolExecutor(1) as executor:
+        for name, fn in [('blocking', lambda: blocking(stamps)),
+                         ('chunked', lambda: cooperative(stamps)),
+                         ('executor', lambda: cooperative(stamps, executor))]:
+            elapsed, median, worst = await measure(fn)
+            print('%12s %10.3f %16.2f %14.2f' % (name, elapsed, median * 1e3, worst * 1e3))
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+import random
+import timeit
+
+import dnsstamps
+from dnsstamps import Option
+from dnsstamps import OptionFlag
+from dnsstamps import Protocol
+from dnsstamps import StampCollection
+from dnsstamps.collection import HasBootstrapIps
+from dnsstamps.collection import HasOptions
+from dnsstamps.collection import HostnameUnder
+from dnsstamps.collection import ProtocolIs
+
+COUNT = 100000
+HASH = "3e1a1a0f6c53f3e97a492d57084b5b9807059ee057ab1505876fd83fda3db838"
+
+
+def create_parameters(count):
+    generator = random.Random(0)
+    prepare = [dnsstamps.prepare_doh, dnsstamps.prepare_doq, dnsstamps.prepare_dot]
+    parameters = []
+    for i in range(count):
+        options = [option for option in Option if generator.random() < 0.5]
+        hostname = "resolver%d.example.%s" % (i, generator.choice(["net", "com", "org"]))
+        bootstrap_ips = ["9.9.9.9"] if generator.random() < 0.1 else []
+        kind = generator.randrange(len(prepare))
+        if kind == 0:
+            parameters.append(prepare[0]("", [HASH], hostname, "/dns-query", options, bootstrap_ips))
+        else:
+            parameters.append(prepare[kind]("", [HASH], hostname, options, bootstrap_ips))
+    return parameters
+
+
+def main():
+    parameters = create_parameters(COUNT)
+    collection = StampCollection(parameters)
+    wanted = int(OptionFlag.DNSSEC | OptionFlag.NO_LOGS)
+
+    def scan():
+        return [p for p in parameters
+                if p.protocol in (Protocol.DOH, Protocol.DOQ) and Option.DNSSEC in p.options and
+                Option.NO_LOGS in p.options and p.hostname.endswith(".example.net") and p.bootstrap_ips]
+
+    predicate = (ProtocolIs(Protocol.DOH, Protocol.DOQ) & HasOptions(wanted) & HostnameUnder("example.net") &
+                 HasBootstrapIps())
+
+    assert scan() == collection.query(predicate)
+    for name, function in [('scan', scan), ('indexed', lambda: collection.query(predicate))]:
+        elapsed = min(timeit.repeat(function, number=1, repeat=5))
+        print('%8s %8.2f ms / %d stamps' % (name, elapsed * 1e3, COUNT))
+
+
+if __name__ == '__main__':
+    main()
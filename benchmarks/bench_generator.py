@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+import base64
+import binascii
+import hashlib
+import struct
+import timeit
+
+import dnsstamps
+
+SIZES = [1, 16, 128, 1024]
+
+
+def create_parameter(size):
+    hashes = [hashlib.sha256(b"%d" % i).hexdigest() for i in range(size)]
+    bootstrap_ips = ["10.%d.%d.%d" % (i >> 16 & 255, i >> 8 & 255, i & 255) for i in range(size)]
+    return dnsstamps.prepare_doh("127.0.0.1", hashes, "doh.example.com", "/dns-query", bootstrap_ips=bootstrap_ips)
+
+
+def concatenating_build(parameter):
+    # Reference copy of the previous generator, which concatenated intermediate bytes objects.
+    def text(value, high_bit=False):
+        return struct.pack("<B", len(value) | (high_bit << 7)) + value.encode('raw-unicode-escape')
+
+    def raw(value, high_bit=False):
+        binary = binascii.unhexlify(value)
+        return struct.pack("<B", len(binary) | (high_bit << 7)) + binary
+
+    def array(pack, values):
+        result = b''
+        for i, value in enumerate(values):
+            result += pack(value, i != len(values) - 1)
+        return result
+
+    payload = (struct.pack("<B", parameter.protocol.value) +
+               struct.pack("<Q", parameter.flags) +
+               text(parameter.address) +
+               array(raw, parameter.hashes) +
+               text(parameter.hostname) +
+               text(parameter.path) +
+               array(text, parameter.bootstrap_ips))
+    return "sdns://" + base64.urlsafe_b64encode(payload).decode("utf-8").rstrip("=")
+
+
+def measure(function, parameter, number):
+    return min(timeit.repeat(lambda: function(parameter), number=number, repeat=5)) / number
+
+
+def main():
+    buffer = bytearray()
+    print('%8s %16s %14s %16s' % ('items', 'concat (us)', 'build (us)', 'build_into (us)'))
+    for size in SIZES:
+        parameter = create_parameter(size)
+        assert concatenating_build(parameter) == dnsstamps.build(parameter)
+        number = max(1, 20000 // size)
+        concat = measure(concatenating_build, parameter, number)
+        build = measure(dnsstamps.build, parameter, number)
+        build_into = measure(lambda p: dnsstamps.build_into(buffer, p), parameter, number)
+        print('%8d %16.1f %14.1f %16.1f' % (size, concat * 1e6, build * 1e6, build_into * 1e6))
+
+
+if __name__ == '__main__':
+    main()
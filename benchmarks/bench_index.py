@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+import timeit
+
+import dnsstamps
+from benchmarks.bench_collection import HASH
+from benchmarks.bench_collection import create_parameters
+from dnsstamps import StampIndex
+
+COUNT = 10000
+CHANGED = 0.01
+
+
+def main():
+    stamps = [dnsstamps.build(parameter) for parameter in create_parameters(COUNT)]
+    old = [('resolver%d' % i, stamp) for i, stamp in enumerate(stamps)]
+    new = list(old)
+    for i in range(0, COUNT, int(1 / CHANGED)):
+        parameter = dnsstamps.parse(new[i][1])
+        parameter.hashes = [HASH[::-1]]
+        new[i] = (new[i][0], dnsstamps.build(parameter))
+
+    def update():
+        index = StampIndex(old)
+        start = timeit.default_timer()
+        index.update(new)
+        return timeit.default_timer() - start
+
+    full = min(timeit.repeat(lambda: {key: dnsstamps.parse(stamp) for key, stamp in new}, number=1, repeat=5))
+    incremental = min(update() for _ in range(5))
+
+    print('%12s %12s' % ('method', 'time (ms)'))
+    print('%12s %12.2f' % ('full', full * 1e3))
+    print('%12s %12.2f' % ('incremental', incremental * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+import gc
+import timeit
+import tracemalloc
+
+import dnsstamps
+
+STAMPS = [
+    "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AQAAAAAAAAAAGltmZTgwOjo2ZDZkOmY3MmM6M2FkOjYwYjhdIMtq3Fwp-VUQC2W_EpT-VoRXmrNJnMl5jwDQG7XBqaLHGzIuZG5zY3J5cHQtY2VydC5leGFtcGxlLmNvbQ",
+    "sdns://AgAAAAAAAAAACTEyNy4wLjAuMaA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OCDQskN3amwQ5EhbNOo-OzoGPzCJdw4Ep4yAh7fEnU-Y1g9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQ",
+    "sdns://AwAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb3QuZXhhbXBsZS5jb20HMS4xLjEuMQ",
+]
+COUNT = 100000
+
+
+def footprint(frozen):
+    stamps = STAMPS * (COUNT // len(STAMPS))
+    gc.collect()
+    tracemalloc.start()
+    parameters = list(dnsstamps.parse_many(stamps, frozen=frozen))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return parameters, size
+
+
+def access(parameters):
+    return min(timeit.repeat(lambda: [parameter.hostname for parameter in parameters], number=1, repeat=5))
+
+
+def main():
+    print('%8s %12s %14s %16s' % ('type', 'MiB / 100k', 'bytes / stamp', 'access (ns/op)'))
+    for name, frozen in [('mutable', False), ('frozen', True)]:
+        parameters, size = footprint(frozen)
+        elapsed = access(parameters)
+        print('%8s %12.1f %14d %16.1f' % (name, size / 2 ** 20 * 100000 / len(parameters), size / len(parameters),
+                                          elapsed / len(parameters) * 1e9))
+
+
+if __name__ == '__main__':
+    main()
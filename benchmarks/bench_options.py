@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+
+import timeit
+
+import dnsstamps
+from dnsstamps import Option
+from dnsstamps import OptionFlag
+
+STAMPS = [
+    "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AAUAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AAMAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AAAAAAAAAAAACTEyNy4wLjAuMQ",
+]
+COUNT = 100000
+
+
+def main():
+    parameters = list(dnsstamps.parse_many(STAMPS * (COUNT // len(STAMPS))))
+    options = [parameter.options for parameter in parameters]
+    wanted = int(OptionFlag.DNSSEC | OptionFlag.NO_LOGS)
+
+    def by_options():
+        return [parameter for parameter, values in zip(parameters, options)
+                if Option.DNSSEC in values and Option.NO_LOGS in values]
+
+    def by_flags():
+        return [parameter for parameter in parameters if parameter.flags & wanted == wanted]
+
+    assert by_options() == by_flags()
+    for name, function in [('options list', by_options), ('flags', by_flags)]:
+        elapsed = min(timeit.repeat(function, number=1, repeat=5))
+        print('%14s %8.1f ms / %d stamps' % (name, elapsed * 1e3, len(parameters)))
+
+
+if __name__ == '__main__':
+    main()
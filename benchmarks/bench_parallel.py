@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+import os
+import time
+
+import dnsstamps
+
+STAMPS = [
+    "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AQAAAAAAAAAAGltmZTgwOjo2ZDZkOmY3MmM6M2FkOjYwYjhdIMtq3Fwp-VUQC2W_EpT-VoRXmrNJnMl5jwDQG7XBqaLHGzIuZG5zY3J5cHQtY2VydC5leGFtcGxlLmNvbQ",
+    "sdns://AgAAAAAAAAAACTEyNy4wLjAuMaA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OCDQskN3amwQ5EhbNOo-OzoGPzCJdw4Ep4yAh7fEnU-Y1g9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQ",
+    "sdns://AwAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb3QuZXhhbXBsZS5jb20HMS4xLjEuMQ",
+]
+COUNT = 200000
+WORKERS = [1, 2, 4, 8]
+
+
+def measure(function):
+    start = time.perf_counter()
+    for _ in function():
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    stamps = STAMPS * (COUNT // len(STAMPS))
+    serial = measure(lambda: dnsstamps.parse_many(stamps))
+
+    print('%d stamps, %d cpus' % (len(stamps), os.cpu_count()))
+    print('%8s %10s %14s %8s' % ('workers', 'time (s)', 'stamps/s', 'speedup'))
+    print('%8s %10.2f %14d %8s' % ('serial', serial, len(stamps) / serial, '1.0x'))
+    for workers in WORKERS:
+        elapsed = measure(lambda: dnsstamps.parse_parallel(stamps, workers=workers))
+        print('%8d %10.2f %14d %7.1fx' % (workers, elapsed, len(stamps) / elapsed, serial / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+import base64
+import hashlib
+import binascii
+import struct
+import timeit
+
+import dnsstamps
+from dnsstamps.parser import parser
+
+SIZES = [1, 16, 128, 1024, 4096]
+
+
+def create_stamp(size):
+    hashes = [hashlib.sha256(b"%d" % i).hexdigest() for i in range(size)]
+    bootstrap_ips = ["10.%d.%d.%d" % (i >> 16 & 255, i >> 8 & 255, i & 255) for i in range(size)]
+    return dnsstamps.create_doh("127.0.0.1", hashes, "doh.example.com", "/dns-query", bootstrap_ips=bootstrap_ips)
+
+
+class SlicingDecoder:
+    # Reference copy of the previous decoder, which re-sliced the remaining payload for every field.
+
+    def __init__(self, stamp):
+        self.data = base64.urlsafe_b64decode(stamp.replace('sdns://', '') + '===')
+
+    def length(self):
+        return struct.unpack('<B', self.data[:1])[0] & ~(1 << 7)
+
+    def more(self):
+        return struct.unpack('<B', self.data[:1])[0] & (1 << 7)
+
+    def text(self):
+        length = self.length()
+        text = self.data[1:length + 1].decode('raw-unicode-escape')
+        self.data = self.data[length + 1:]
+        return text
+
+    def raw(self):
+        length = self.length()
+        raw = self.data[1:length + 1]
+        try:
+            raw.decode('utf-8')
+            return None
+        except UnicodeDecodeError:
+            self.data = self.data[length + 1:]
+            return binascii.hexlify(raw)
+
+    def array(self, consume):
+        items = []
+        done = len(self.data) == 0
+        while not done:
+            done = not self.more()
+            item = consume()
+            if item is None:
+                break
+            items.append(item)
+        return items
+
+    def parse_doh(self):
+        parameter = dnsstamps.Parameter()
+        parameter.protocol = dnsstamps.Protocol(struct.unpack('<B', self.data[:1])[0])
+        self.data = self.data[9:]
+        parameter.address = self.text()
+        parameter.hashes = self.array(self.raw)
+        parameter.hostname = self.text()
+        parameter.path = self.text()
+        parameter.bootstrap_ips = self.array(self.text)
+        return parameter
+
+
+def slicing_parse(stamp):
+    return SlicingDecoder(stamp).parse_doh()
+
+
+def measure(function, stamp, number):
+    return min(timeit.repeat(lambda: function(stamp), number=number, repeat=5)) / number
+
+
+def main():
+    print('%8s %10s %14s %14s %8s' % ('items', 'bytes', 'slicing (us)', 'cursor (us)', 'speedup'))
+    for size in SIZES:
+        stamp = create_stamp(size)
+        number = max(1, 20000 // size)
+        slicing = measure(slicing_parse, stamp, number)
+        cursor = measure(parser.parse, stamp, number)
+        print('%8d %10d %14.1f %14.1f %7.1fx' % (size, len(stamp), slicing * 1e6, cursor * 1e6, slicing / cursor))
+
+
+if __name__ == '__main__':
+    main()
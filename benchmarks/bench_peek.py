@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+
+import timeit
+
+import dnsstamps
+
+STAMPS = [
+    "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AQAAAAAAAAAAGltmZTgwOjo2ZDZkOmY3MmM6M2FkOjYwYjhdIMtq3Fwp-VUQC2W_EpT-VoRXmrNJnMl5jwDQG7XBqaLHGzIuZG5zY3J5cHQtY2VydC5leGFtcGxlLmNvbQ",
+    "sdns://AgAAAAAAAAAACTEyNy4wLjAuMaA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OCDQskN3amwQ5EhbNOo-OzoGPzCJdw4Ep4yAh7fEnU-Y1g9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQ",
+    "sdns://AwAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb3QuZXhhbXBsZS5jb20HMS4xLjEuMQ",
+]
+COUNT = 100000
+
+
+def main():
+    stamps = STAMPS * (COUNT // len(STAMPS))
+    cases = [
+        ('parse', lambda: [parameter.flags for parameter in dnsstamps.parse_many(stamps)]),
+        ('parse lazy', lambda: [parameter.flags for parameter in dnsstamps.parse_many(stamps, lazy=True)]),
+        ('peek_many', lambda: [header.flags for header in dnsstamps.peek_many(stamps)]),
+    ]
+    for name, function in cases:
+        elapsed = min(timeit.repeat(function, number=1, repeat=3))
+        print('%12s %8.1f ms %10d stamps/s' % (name, elapsed * 1e3, len(stamps) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+
+import timeit
+
+import dnsstamps
+from benchmarks.bench_memory import STAMPS
+
+COUNT = 100000
+
+
+def touch(parameters):
+    for parameter in parameters:
+        parameter.flags = parameter.flags
+    return parameters
+
+
+def main():
+    stamps = STAMPS * (COUNT // len(STAMPS))
+    kept = list(dnsstamps.parse_many(stamps))
+    dirty = touch(list(dnsstamps.parse_many(stamps)))
+    frozen = list(dnsstamps.parse_many(stamps, frozen=True))
+
+    print('%12s %12s %14s' % ('parameters', 'build (s)', 'round-trip ok'))
+    for name, parameters in [('untouched', kept), ('dirty', dirty), ('frozen', frozen)]:
+        elapsed = min(timeit.repeat(lambda: [dnsstamps.build(parameter) for parameter in parameters], number=1,
+                                    repeat=3))
+        ok = all(dnsstamps.build(parameter) == stamp for parameter, stamp in zip(parameters, stamps))
+        print('%12s %12.3f %14s' % (name, elapsed, ok))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+import dnsstamps
+from benchmarks.bench_memory import STAMPS
+
+SIZES = [10000, 100000]
+
+
+def write_file(path, count):
+    with open(path, 'w') as file:
+        for index in range(count):
+            file.write('%d %s\n' % (index, STAMPS[index % len(STAMPS)]))
+
+
+def read_lines(path):
+    with open(path) as file:
+        for line in file:
+            yield line.split()[1]
+
+
+def read_all(path):
+    with open(path) as file:
+        return file.read().split()[1::2]
+
+
+def measure(fn):
+    start = time.perf_counter()
+    count = sum(1 for _ in fn())
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    sum(1 for _ in fn())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    print('%10s %8s %12s %14s' % ('stamps', 'method', 'time (s)', 'peak (KiB)'))
+    handle, path = tempfile.mkstemp()
+    os.close(handle)
+    try:
+        for size in SIZES:
+            write_file(path, size)
+            for name, fn in [('lines', lambda: dnsstamps.parse_many(read_lines(path))),
+                             ('read', lambda: dnsstamps.parse_many(read_all(path))),
+                             ('mmap', lambda: dnsstamps.scan_file(path))]:
+                count, elapsed, peak = measure(fn)
+                print('%10d %8s %12.3f %14.1f' % (count, name, elapsed, peak / 1024))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
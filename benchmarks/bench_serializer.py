@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+import io
+import json
+import timeit
+
+import dnsstamps
+from benchmarks.bench_memory import STAMPS
+
+COUNT = 100000
+
+
+def main():
+    parameters = list(dnsstamps.parse_many(STAMPS * (COUNT // len(STAMPS))))
+
+    methods = [
+        ('json.dumps(vars)', lambda: [json.dumps(vars(parameter), default=str) for parameter in parameters]),
+        ('json.dumps(to_dict)', lambda: [json.dumps(dnsstamps.to_dict(parameter)) for parameter in parameters]),
+        ('to_dict', lambda: [dnsstamps.to_dict(parameter) for parameter in parameters]),
+        ('to_json', lambda: [dnsstamps.to_json(parameter) for parameter in parameters]),
+        ('dump_json', lambda: dnsstamps.dump_json(parameters, io.StringIO())),
+    ]
+
+    print('%20s %12s %14s' % ('method', 'time (s)', 'stamps / s'))
+    for name, fn in methods:
+        elapsed = min(timeit.repeat(fn, number=1, repeat=3))
+        print('%20s %12.3f %14d' % (name, elapsed, len(parameters) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+import random
+import timeit
+
+import dnsstamps
+from dnsstamps.corpus import generate
+
+COUNT = 100000
+SHARES = [0.0, 0.1, 0.5, 0.9]
+
+
+def corrupt(stamp, rng):
+    kind = rng.randrange(3)
+    if kind == 0:
+        return stamp[:rng.randrange(8, len(stamp))]
+    if kind == 1:
+        return 'sdns://' + rng.choice('ABCDEFGHIJK') + stamp[8:]
+    return stamp[:-1] + '!'
+
+
+def dirty_list(stamps, share, seed=0):
+    rng = random.Random(seed)
+    return [corrupt(stamp, rng) if rng.random() < share else stamp for stamp in stamps]
+
+
+def parse_with_exceptions(stamps):
+    return sum(1 for result in dnsstamps.parse_many(stamps, yield_errors=True) if type(result) is tuple)
+
+
+def parse_with_failures(stamps):
+    return sum(1 for result in dnsstamps.try_parse_many(stamps) if type(result) is dnsstamps.ParseFailure)
+
+
+def main():
+    stamps = list(generate(COUNT, seed=25))
+    print('%6s %8s %16s %16s' % ('bad', 'failed', 'parse_many/s', 'try_parse/s'))
+    for share in SHARES:
+        dirty = dirty_list(stamps, share)
+        failed = parse_with_exceptions(dirty)
+        assert failed == parse_with_failures(dirty)
+        raising = min(timeit.repeat(lambda: parse_with_exceptions(dirty), number=1, repeat=3))
+        checked = min(timeit.repeat(lambda: parse_with_failures(dirty), number=1, repeat=3))
+        print('%5.0f%% %8d %16d %16d' % (share * 100, failed, len(dirty) / raising, len(dirty) / checked))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+import dnsstamps
+from benchmarks.bench_validate import dirty_list
+from dnsstamps import Option
+from dnsstamps.corpus import generate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(ROOT, 'bin', 'dnsstamp.py')
+
+OPTIONS = [Option.DNSSEC, Option.NO_LOGS]
+HASH = "3e1a1a0f6c53f3e97a492d57084b5b9807059ee057ab1505876fd83fda3db838"
+LONG_TEXT = "a" * 127
+LONG_HASH = "ff" * 127
+MANY_HASHES = [LONG_HASH] * 16
+MANY_IPS = ["10.0.%d.%d" % (i // 256, i % 256) for i in range(16)]
+
+SMALL = {
+    'plain': dnsstamps.prepare_plain("127.0.0.1", OPTIONS),
+    'dnscrypt': dnsstamps.prepare_dnscrypt("127.0.0.1", HASH, "2.dnscrypt-cert.example.com", OPTIONS),
+    'doh': dnsstamps.prepare_doh("127.0.0.1", [HASH], "doh.example.com", "/dns-query", OPTIONS),
+    'dot': dnsstamps.prepare_dot("127.0.0.1", [HASH], "dot.example.com", OPTIONS),
+    'doq': dnsstamps.prepare_doq("127.0.0.1", [HASH], "doq.example.com", OPTIONS),
+    'doh_target': dnsstamps.prepare_doh_target("doh-target.example.com", "/dns-query", OPTIONS),
+    'dnscrypt_relay': dnsstamps.prepare_dnscrypt_relay("127.0.0.1:443"),
+    'doh_relay': dnsstamps.prepare_doh_relay("127.0.0.1", [HASH], "doh-relay.example.com", "/dns-query", OPTIONS),
+}
+WORST = {
+    'plain': dnsstamps.prepare_plain(LONG_TEXT, OPTIONS),
+    'dnscrypt': dnsstamps.prepare_dnscrypt(LONG_TEXT, LONG_HASH, LONG_TEXT, OPTIONS),
+    'doh': dnsstamps.prepare_doh(LONG_TEXT, MANY_HASHES, LONG_TEXT, LONG_TEXT, OPTIONS, MANY_IPS),
+    'dot': dnsstamps.prepare_dot(LONG_TEXT, MANY_HASHES, LONG_TEXT, OPTIONS, MANY_IPS),
+    'doq': dnsstamps.prepare_doq(LONG_TEXT, MANY_HASHES, LONG_TEXT, OPTIONS, MANY_IPS),
+    'doh_target': dnsstamps.prepare_doh_target(LONG_TEXT, LONG_TEXT, OPTIONS),
+    'dnscrypt_relay': dnsstamps.prepare_dnscrypt_relay(LONG_TEXT),
+    'doh_relay': dnsstamps.prepare_doh_relay(LONG_TEXT, MANY_HASHES, LONG_TEXT, LONG_TEXT, OPTIONS, MANY_IPS),
+}
+BATCH_SIZE = 10000
+DEFAULT_THRESHOLD = 0.1
+
+
+def measure(function, repeat, duration):
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < duration:
+        number *= 2
+    return min(timer.repeat(repeat, number)) / number
+
+
+def format_quietly(parameter):
+    with contextlib.redirect_stdout(io.StringIO()):
+        dnsstamps.format(parameter)
+
+
+def cold_start(stamp, repeat):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+
+    def run():
+        subprocess.run([sys.executable, CLI, 'parse', stamp], env=env, check=True, stdout=subprocess.DEVNULL)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def run_suite(quick=False):
+    repeat = 3 if quick else 5
+    duration = 0.02 if quick else 0.1
+    results = {}
+
+    for size, parameters in [('small', SMALL), ('worst', WORST)]:
+        for name, parameter in parameters.items():
+            stamp = dnsstamps.build(parameter)
+            parsed = dnsstamps.parse(stamp)
+            results['parse/%s/%s' % (name, size)] = measure(lambda: dnsstamps.parse(stamp), repeat, duration)
+            results['build/%s/%s' % (name, size)] = measure(lambda: dnsstamps.build(parameter), repeat, duration)
+            results['format/%s/%s' % (name, size)] = measure(lambda: format_quietly(parsed), repeat, duration)
+
+    for size, parameters in [('small', SMALL), ('worst', WORST)]:
+        prepared = list(parameters.values()) * (BATCH_SIZE // len(parameters))
+        stamps = [dnsstamps.build(parameter) for parameter in prepared]
+        results['parse_many/%s' % size] = measure(lambda: list(dnsstamps.parse_many(stamps)), repeat, duration)
+        results['build_many/%s' % size] = measure(lambda: [dnsstamps.build(p) for p in prepared], repeat, duration)
+
+    stamps = list(generate(BATCH_SIZE))
+    results['parse_many/corpus'] = measure(lambda: list(dnsstamps.parse_many(stamps)), repeat, duration)
+
+    dirty = dirty_list(stamps, 0.5)
+    results['parse_many/dirty'] = measure(lambda: list(dnsstamps.parse_many(dirty, yield_errors=True)), repeat,
+                                          duration)
+    results['try_parse_many/dirty'] = measure(lambda: list(dnsstamps.try_parse_many(dirty)), repeat, duration)
+
+    results['cli/cold_start'] = cold_start(dnsstamps.build(SMALL['doh']), repeat)
+    return results
+
+
+def save(path, results):
+    document = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w') as file:
+        json.dump(document, file, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)['results']
+
+
+def compare(baseline, current, threshold):
+    regressions = []
+    print('%-28s %12s %12s %8s' % ('benchmark', 'baseline', 'current', 'change'))
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in baseline or name not in current:
+            print('%-28s %12s %12s %8s' % (name, 'missing' if name not in baseline else '',
+                                            'missing' if name not in current else '', ''))
+            continue
+        change = current[name] / baseline[name] - 1
+        flag = ''
+        if change > threshold:
+            flag = ' REGRESSION'
+            regressions.append(name)
+        print('%-28s %10.2fus %10.2fus %+7.1f%%%s' % (name, baseline[name] * 1e6, current[name] * 1e6, change * 100,
+                                                      flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the dnsstamps benchmark suite.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the suite and store the results as JSON')
+    run.add_argument('-o', '--output', default='benchmarks.json', help="the result file (default: benchmarks.json)")
+    run.add_argument('--quick', action='store_true', help="use fewer iterations")
+
+    check = commands.add_parser('compare', help='compare two result files and flag regressions')
+    check.add_argument('baseline', help="the baseline result file")
+    check.add_argument('current', help="the result file to check")
+    check.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+                       help="the allowed slowdown before flagging a regression (default: 0.1 = 10%%)")
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run_suite(args.quick)
+        save(args.output, results)
+        for name, elapsed in sorted(results.items()):
+            print('%-28s %12.2fus' % (name, elapsed * 1e6))
+    else:
+        regressions = compare(load(args.baseline), load(args.current), args.threshold)
+        if regressions:
+            sys.exit('%d regression(s) above %.0f%%' % (len(regressions), args.threshold * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,76 @@
 #!/usr/bin/env python
 
 import argparse
+import csv
+import itertools
+import json
 import sys
 
 import dnsstamps
 from dnsstamps import Option
+from dnsstamps import corpus
+
+PREPARERS = {
+    'plain': (dnsstamps.prepare_plain, ['address', 'options']),
+    'dnscrypt': (dnsstamps.prepare_dnscrypt, ['address', 'public_key', 'provider_name', 'options']),
+    'doh': (dnsstamps.prepare_doh, ['address', 'hashes', 'hostname', 'path', 'options', 'bootstrap_ips']),
+    'dot': (dnsstamps.prepare_dot, ['address', 'hashes', 'hostname', 'options', 'bootstrap_ips']),
+    'doq': (dnsstamps.prepare_doq, ['address', 'hashes', 'hostname', 'options', 'bootstrap_ips']),
+    'doh_target': (dnsstamps.prepare_doh_target, ['hostname', 'path', 'options']),
+    'dnscrypt_relay': (dnsstamps.prepare_dnscrypt_relay, ['address']),
+    'doh_relay': (dnsstamps.prepare_doh_relay, ['address', 'hashes', 'hostname', 'path', 'options', 'bootstrap_ips']),
+}
+REQUIRED_FIELDS = {'public_key', 'provider_name', 'hostname', 'path'}
+LIST_FIELDS = {'hashes', 'options', 'bootstrap_ips'}
+
+
+def read_stamps(file):
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if line:
+            yield number, line
+
+
+def read_rows(file, format):
+    with file:
+        if format == 'json':
+            return json.load(file)
+        return list(csv.DictReader(file))
+
+
+def row_options(names):
+    try:
+        return [Option[name.upper()] for name in names]
+    except KeyError as e:
+        raise ValueError('Unknown option <%s>' % e.args[0])
+
+
+def prepare_row(row):
+    protocol = str(row.get('protocol') or '').strip().lower()
+    if protocol not in PREPARERS:
+        raise ValueError('Unknown protocol <%s>' % protocol)
+
+    prepare, fields = PREPARERS[protocol]
+    arguments = []
+    for field in fields:
+        value = row.get(field)
+        if value is None or value == '':
+            if field in REQUIRED_FIELDS:
+                raise ValueError('Missing %s' % field)
+            value = [] if field in LIST_FIELDS else ''
+        elif field in LIST_FIELDS and isinstance(value, str):
+            value = [item.strip() for item in value.split(',') if item.strip()]
+        if field == 'options':
+            value = row_options(value)
+        arguments.append(value)
+    return prepare(*arguments)
+
+
+def error_row(error):
+    row = {'error': '; '.join(str(arg) for arg in error.args)}
+    if isinstance(error, dnsstamps.StampError):
+        row.update(code=error.code, field=error.field, offset=error.offset)
+    return row
 
 
 class DnsStampCli(object):
@@ -36,8 +102,8 @@ class DnsStampCli(object):
     def __init__(self):
         parser = argparse.ArgumentParser(usage='%(prog)s <command> [<args>]')
         parser.add_argument('command',
-                            choices=['parse', 'plain', 'dnscrypt', 'doh', 'dot', 'doq', 'doh_target', 'dnscrypt_relay',
-                                     'doh_relay'],
+                            choices=['parse', 'build', 'corpus', 'plain', 'dnscrypt', 'doh', 'dot', 'doq', 'doh_target',
+                                     'dnscrypt_relay', 'doh_relay'],
                             help='The command to execute.')
 
         args = parser.parse_args(sys.argv[1:2])
@@ -46,15 +112,149 @@ class DnsStampCli(object):
     def parse(self):
         parser = argparse.ArgumentParser(description='Parse DNS stamp.')
 
-        parser.add_argument('stamp', type=str, help='The stamp to parse.')
+        parser.add_argument('stamp', type=str, nargs='?', help='The stamp to parse.')
+        parser.add_argument('--batch',
+                            metavar='FILE',
+                            type=argparse.FileType('r'),
+                            help="parse one stamp per line of FILE (or - for stdin) and print NDJSON")
+        parser.add_argument('--jobs',
+                            metavar='N',
+                            type=int,
+                            default=1,
+                            help="the number of worker processes used with --batch (default: 1)")
 
         args = parser.parse_args(sys.argv[2:])
 
+        if args.batch is not None:
+            sys.exit(self.parse_batch(args.batch, args.jobs))
+        if args.stamp is None:
+            parser.error('either a stamp or --batch is required')
+
+        result = dnsstamps.try_parse(args.stamp)
+        if isinstance(result, dnsstamps.ParseFailure):
+            print("Unable to parse DNS stamp <%s>: %s (%s at field %s, offset %s)" % (
+                args.stamp, result.message, result.code, result.field, result.offset))
+        else:
+            dnsstamps.format(result)
+
+    @staticmethod
+    def parse_batch(file, jobs):
+        entries, copies = itertools.tee(read_stamps(file))
+        stamps = (stamp for _, stamp in copies)
+        if jobs > 1:
+            results = dnsstamps.parse_parallel(stamps, workers=jobs, yield_errors=True)
+        else:
+            results = dnsstamps.parse_many(stamps, yield_errors=True)
+
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+        failed = 0
+        with file:
+            for (number, stamp), result in zip(entries, results):
+                if isinstance(result, tuple):
+                    row = encode(error_row(result[1]))
+                    failed += 1
+                else:
+                    row = dnsstamps.to_json(result)
+                sys.stdout.write('{"line":%d,"stamp":%s,%s\n' % (number, encode(stamp), row[1:]))
+        sys.stdout.flush()
+        return 1 if failed else 0
+
+    def build(self):
+        parser = argparse.ArgumentParser(description='Create DNS stamps from an inventory.')
+
+        parser.add_argument('--from',
+                            dest='source',
+                            metavar='FILE',
+                            required=True,
+                            type=argparse.FileType('r'),
+                            help="a CSV or JSON file (or - for stdin) with one server per row, using the columns "
+                                 "protocol, address, public_key, provider_name, hashes, hostname, path, "
+                                 "bootstrap_ips and options (e.g.: dnssec,no_logs)")
+        parser.add_argument('--format',
+                            choices=['csv', 'json'],
+                            help="the format of FILE (default: guessed from its extension, csv for stdin)")
+
+        args = parser.parse_args(sys.argv[2:])
+
+        format = args.format
+        if format is None:
+            format = 'json' if args.source.name.lower().endswith('.json') else 'csv'
+
+        try:
+            rows = read_rows(args.source, format)
+        except Exception as e:
+            sys.exit("Unable to read %s: %s" % (args.source.name, e))
+
+        buffer = bytearray()
+        stamps = []
+        errors = []
+        for number, row in enumerate(rows, 1):
+            try:
+                stamps.append(dnsstamps.build_into(buffer, prepare_row(row)))
+            except Exception as e:
+                errors.append("Invalid row %d: %s" % (number, '; '.join(str(arg) for arg in e.args)))
+
+        if errors:
+            sys.exit('\n'.join(errors))
+        sys.stdout.write(''.join(stamp + '\n' for stamp in stamps))
+
+    def corpus(self):
+        parser = argparse.ArgumentParser(description='Create a reproducible corpus of random DNS stamps.')
+
+        parser.add_argument('-c', '--count',
+                            required=True,
+                            type=int,
+                            help="the number of stamps to create")
+        parser.add_argument('--seed',
+                            type=int,
+                            default=0,
+                            help="the seed of the random generator (default: 0)")
+        parser.add_argument('-o', '--output',
+                            metavar='FILE',
+                            type=argparse.FileType('w'),
+                            default=sys.stdout,
+                            help="the file to write one stamp per line to (default: stdout)")
+        parser.add_argument('--protocols',
+                            type=str,
+                            help="comma-separated protocol weights (e.g.: doh=3,dnscrypt=1)")
+        parser.add_argument('--hashes',
+                            type=str,
+                            help="comma-separated weights of hash counts (e.g.: 0=3,1=6,2=1)")
+        parser.add_argument('--bootstrap_ips',
+                            type=str,
+                            help="comma-separated weights of bootstrap ip counts (e.g.: 0=7,1=2,2=1)")
+        parser.add_argument('--ports',
+                            type=str,
+                            help="comma-separated weights of ports, 0 for none (e.g.: 0=7,443=2,8443=1)")
+        parser.add_argument('--ipv6',
+                            type=float,
+                            help="the share of IPv6 addresses (e.g.: 0.2)")
+        parser.add_argument('--options',
+                            type=float,
+                            help="the probability of each option being set (e.g.: 0.5)")
+
+        args = parser.parse_args(sys.argv[2:])
+
+        distribution = corpus.DEFAULT_DISTRIBUTION
         try:
-            parameter = dnsstamps.parse(args.stamp)
-            dnsstamps.format(parameter)
-        except:
-            print("Unable to parse DNS stamp <%s>" % args.stamp)
+            if args.protocols is not None:
+                distribution = distribution._replace(
+                    protocols=corpus.parse_weights(args.protocols, corpus.protocol_from_name))
+            if args.hashes is not None:
+                distribution = distribution._replace(hashes=corpus.parse_weights(args.hashes))
+            if args.bootstrap_ips is not None:
+                distribution = distribution._replace(bootstrap_ips=corpus.parse_weights(args.bootstrap_ips))
+            if args.ports is not None:
+                distribution = distribution._replace(ports=corpus.parse_weights(args.ports))
+            if args.ipv6 is not None:
+                distribution = distribution._replace(ipv6=args.ipv6)
+            if args.options is not None:
+                distribution = distribution._replace(options=args.options)
+
+            with args.output:
+                corpus.write_corpus(args.output, args.count, args.seed, distribution)
+        except ValueError as e:
+            parser.error(e.args[0])
 
     def plain(self):
         parser = argparse.ArgumentParser(description='Create plain stamp')
@@ -1,9 +1,13 @@
 from .option import Option
+from .option import OptionFlag
 from .protocol import Protocol
 
+from .parameter import FrozenParameter
+from .parameter import LazyParameter
 from .parameter import Parameter
 
 from .generator import build
+from .generator import build_into
 from .generator import create_dnscrypt
 from .generator import create_dnscrypt_relay
 from .generator import create_doh
@@ -21,6 +25,33 @@ from .generator import prepare_dot
 from .generator import prepare_doq
 from .generator import prepare_plain
 
+from .error import ParseFailure
+from .error import StampError
+
+from .parser import Header
 from .parser import parse
+from .parser import parse_many
+from .parser import parse_parallel
+from .parser import peek
+from .parser import peek_many
+from .parser import scan_buffer
+from .parser import scan_file
+from .parser import try_parse
+from .parser import try_parse_many
 
 from .formatter import format
+
+from .serializer import dump_json
+from .serializer import from_dict
+from .serializer import to_dict
+from .serializer import to_json
+
+from .cache import BuildCache
+from .cache import CacheInfo
+from .cache import ParseCache
+
+from .collection import StampCollection
+
+from .index import StampIndex
+
+from .resolvers import read_resolvers
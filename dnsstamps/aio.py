@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+
+from dnsstamps.generator.generator import build_reusing
+from dnsstamps.parser.parser import parse_stamp
+from dnsstamps.parser.state import State
+
+CHUNK_SIZE = 256
+QUEUE_SIZE = 4
+
+DONE = object()
+
+
+def parse_chunk(stamps, offset, yield_errors=False, frozen=False, lazy=False):
+    state = State()
+    results = []
+    for index, stamp in enumerate(stamps, offset):
+        try:
+            results.append(parse_stamp(state, stamp, frozen, lazy))
+        except Exception as e:
+            if not yield_errors:
+                raise
+            results.append((index, e))
+    return results
+
+
+def build_chunk(parameters, offset, yield_errors=False):
+    buffer = bytearray()
+    results = []
+    for index, parameter in enumerate(parameters, offset):
+        try:
+            results.append(build_reusing(buffer, parameter))
+        except Exception as e:
+            if not yield_errors:
+                raise
+            results.append((index, e))
+    return results
+
+
+async def chunked(items, size):
+    chunk = []
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            chunk.append(item)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+    else:
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_in_context(executor, process):
+    if isinstance(executor, ThreadPoolExecutor):
+        return partial(copy_context().run, process)
+    return process
+
+
+async def produce(queue, items, process, chunk_size, executor):
+    loop = asyncio.get_running_loop()
+    offset = 0
+    try:
+        async for chunk in chunked(items, chunk_size):
+            if executor is None:
+                results = process(chunk, offset)
+                await asyncio.sleep(0)
+            else:
+                results = await loop.run_in_executor(executor, run_in_context(executor, process), chunk, offset)
+            await queue.put(results)
+            offset += len(chunk)
+    except Exception as e:
+        await queue.put(e)
+        return
+    await queue.put(DONE)
+
+
+async def consume(items, process, chunk_size, executor, queue_size):
+    queue = asyncio.Queue(queue_size)
+    producer = asyncio.ensure_future(produce(queue, items, process, chunk_size, executor))
+    try:
+        while True:
+            results = await queue.get()
+            if results is DONE:
+                return
+            if isinstance(results, Exception):
+                raise results
+            for result in results:
+                yield result
+    finally:
+        producer.cancel()
+
+
+def parse_many(stamps, yield_errors=False, frozen=False, lazy=False, chunk_size=CHUNK_SIZE, executor=None,
+               queue_size=QUEUE_SIZE):
+    process = partial(parse_chunk, yield_errors=yield_errors, frozen=frozen, lazy=lazy)
+    return consume(stamps, process, chunk_size, executor, queue_size)
+
+
+def build_many(parameters, yield_errors=False, chunk_size=CHUNK_SIZE, executor=None, queue_size=QUEUE_SIZE):
+    process = partial(build_chunk, yield_errors=yield_errors)
+    return consume(parameters, process, chunk_size, executor, queue_size)
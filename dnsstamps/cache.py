@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections import namedtuple
+
+from dnsstamps.generator import build
+from dnsstamps.parameter import PARAMETER_TYPES
+from dnsstamps.parser import parse
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize', 'bytes'])
+
+
+def footprint(value):
+    size = sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(footprint(item) for item in value)
+    return size
+
+
+class LruCache:
+
+    def __init__(self, maxsize=1024, ttl=None, timer=time.monotonic):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError('Invalid maxsize <%s>' % maxsize)
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            value, size, expires = entry
+            if expires is not None and expires <= self._timer():
+                del self._entries[key]
+                self._bytes -= size
+                self._evictions += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        size = footprint(key) + footprint(value)
+        expires = None if self._ttl is None else self._timer() + self._ttl
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+
+            while self._maxsize is not None and len(self._entries) > self._maxsize:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._bytes = 0
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self._maxsize, len(self._entries), self._bytes)
+
+
+class ParseCache(LruCache):
+
+    def parse(self, stamp, frozen=False):
+        parameter = self.get(stamp)
+        if parameter is None:
+            parameter = parse(stamp, frozen=True)
+            self.put(stamp, parameter)
+        return parameter if frozen else parameter.thaw()
+
+
+class BuildCache(LruCache):
+
+    def build(self, parameter):
+        if not isinstance(parameter, PARAMETER_TYPES):
+            raise ValueError('Invalid parameter type %s' % type(parameter))
+
+        key = parameter.to_tuple()
+        stamp = self.get(key)
+        if stamp is None:
+            stamp = build(parameter)
+            self.put(key, stamp)
+        return stamp
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+
+from collections import defaultdict
+
+
+def normalize_hostname(hostname):
+    hostname = hostname.lower().rstrip('.')
+    host, separator, port = hostname.rpartition(':')
+    return host if separator and port.isdigit() else hostname
+
+
+def normalize_address(address):
+    address = address.lower()
+    if address.startswith('['):
+        return address[:address.find(']') + 1]
+    host, separator, port = address.rpartition(':')
+    return host if separator and ':' not in host and port.isdigit() else address
+
+
+def domain_suffixes(hostname):
+    labels = hostname.split('.')
+    return ['.'.join(labels[i:]) for i in range(len(labels))]
+
+
+def option_bits(flags):
+    while flags:
+        bit = flags & -flags
+        yield bit
+        flags ^= bit
+
+
+class Predicate:
+
+    def size(self, collection):
+        return len(collection)
+
+    def restrict(self, collection, keys):
+        return keys & self.keys(collection)
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class And(Predicate):
+
+    def __init__(self, *predicates):
+        self._predicates = predicates
+
+    def keys(self, collection):
+        predicates = sorted(self._predicates, key=lambda predicate: predicate.size(collection))
+        return self.restrict_all(collection, set(predicates[0].keys(collection)), predicates[1:])
+
+    def size(self, collection):
+        return min(predicate.size(collection) for predicate in self._predicates)
+
+    def restrict(self, collection, keys):
+        return self.restrict_all(collection, keys, self._predicates)
+
+    @staticmethod
+    def restrict_all(collection, keys, predicates):
+        for predicate in predicates:
+            if not keys:
+                break
+            keys = predicate.restrict(collection, keys)
+        return keys
+
+
+class Or(Predicate):
+
+    def __init__(self, *predicates):
+        self._predicates = predicates
+
+    def keys(self, collection):
+        return set().union(*(predicate.keys(collection) for predicate in self._predicates))
+
+    def size(self, collection):
+        return min(len(collection), sum(predicate.size(collection) for predicate in self._predicates))
+
+    def restrict(self, collection, keys):
+        return set().union(*(predicate.restrict(collection, keys) for predicate in self._predicates))
+
+
+class Not(Predicate):
+
+    def __init__(self, predicate):
+        self._predicate = predicate
+
+    def keys(self, collection):
+        return collection.keys() - self._predicate.keys(collection)
+
+    def restrict(self, collection, keys):
+        return keys - self._predicate.restrict(collection, keys)
+
+
+class Where(Predicate):
+
+    def __init__(self, function):
+        self._function = function
+
+    def keys(self, collection):
+        return {key for key, parameter in collection.items() if self._function(parameter)}
+
+    def restrict(self, collection, keys):
+        return {key for key in keys if self._function(collection[key])}
+
+
+class Indexed(Predicate):
+
+    def __init__(self, name, *values):
+        self._name = name
+        self._values = values
+
+    def keys(self, collection):
+        if len(self._values) == 1:
+            return set(collection._index(self._name, self._values[0]))
+        return set().union(*(collection._index(self._name, value) for value in self._values))
+
+    def size(self, collection):
+        return sum(len(collection._index(self._name, value)) for value in self._values)
+
+    def restrict(self, collection, keys):
+        if len(self._values) == 1:
+            return keys & collection._index(self._name, self._values[0])
+        return set().union(*(keys & collection._index(self._name, value) for value in self._values))
+
+
+class ProtocolIs(Indexed):
+
+    def __init__(self, *protocols):
+        super().__init__('protocol', *protocols)
+
+
+class HasOptions(And):
+
+    def __init__(self, flags):
+        super().__init__(*(Indexed('flags', bit) for bit in option_bits(int(flags))))
+
+    def keys(self, collection):
+        return super().keys(collection) if self._predicates else set(collection.keys())
+
+    def size(self, collection):
+        return super().size(collection) if self._predicates else len(collection)
+
+
+class HostnameIs(Indexed):
+
+    def __init__(self, hostname):
+        super().__init__('hostname', normalize_hostname(hostname))
+
+
+class HostnameUnder(Indexed):
+
+    def __init__(self, domain):
+        super().__init__('domain', normalize_hostname(domain))
+
+
+class AddressIs(Indexed):
+
+    def __init__(self, address):
+        super().__init__('address', normalize_address(address))
+
+
+class HasBootstrapIps(Indexed):
+
+    def __init__(self):
+        super().__init__('bootstrap_ips', True)
+
+
+class StampCollection:
+
+    def __init__(self, parameters=()):
+        self._parameters = {}
+        self._entries = {}
+        self._indexes = defaultdict(dict)
+        self._next_key = 0
+        for parameter in parameters:
+            self.add(parameter)
+
+    @staticmethod
+    def index_entries(parameter):
+        entries = [('protocol', parameter.protocol)]
+        entries.extend(('flags', bit) for bit in option_bits(parameter.flags))
+
+        if parameter.hostname:
+            hostname = normalize_hostname(parameter.hostname)
+            entries.append(('hostname', hostname))
+            entries.extend(('domain', suffix) for suffix in domain_suffixes(hostname))
+        if parameter.address:
+            entries.append(('address', normalize_address(parameter.address)))
+        if parameter.bootstrap_ips:
+            entries.append(('bootstrap_ips', True))
+        return entries
+
+    def add(self, parameter):
+        key = self._next_key
+        self._next_key += 1
+
+        entries = self.index_entries(parameter)
+        for name, value in entries:
+            self._indexes[name].setdefault(value, set()).add(key)
+
+        self._parameters[key] = parameter
+        self._entries[key] = entries
+        return key
+
+    def remove(self, key):
+        parameter = self._parameters.pop(key)
+        for name, value in self._entries.pop(key):
+            index = self._indexes[name]
+            index[value].discard(key)
+            if not index[value]:
+                del index[value]
+        return parameter
+
+    def _index(self, name, value):
+        return self._indexes[name].get(value, frozenset())
+
+    def index(self, name, value):
+        return frozenset(self._index(name, value))
+
+    def keys(self):
+        return frozenset(self._parameters)
+
+    def items(self):
+        return list(self._parameters.items())
+
+    def query_keys(self, predicate):
+        return sorted(predicate.keys(self))
+
+    def query(self, predicate):
+        return [self._parameters[key] for key in self.query_keys(predicate)]
+
+    def count(self, predicate):
+        return len(predicate.keys(self))
+
+    def __getitem__(self, key):
+        return self._parameters[key]
+
+    def __len__(self):
+        return len(self._parameters)
+
+    def __iter__(self):
+        return iter(self._parameters.values())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+import random
+from collections import namedtuple
+from itertools import accumulate
+
+from dnsstamps import Option
+from dnsstamps import Protocol
+from dnsstamps.generator.generator import build_into
+from dnsstamps.generator.generator import prepare_dnscrypt
+from dnsstamps.generator.generator import prepare_dnscrypt_relay
+from dnsstamps.generator.generator import prepare_doh
+from dnsstamps.generator.generator import prepare_doh_relay
+from dnsstamps.generator.generator import prepare_doh_target
+from dnsstamps.generator.generator import prepare_doq
+from dnsstamps.generator.generator import prepare_dot
+from dnsstamps.generator.generator import prepare_plain
+
+Distribution = namedtuple('Distribution', ['protocols', 'hashes', 'bootstrap_ips', 'ports', 'ipv6', 'options'])
+
+DEFAULT_DISTRIBUTION = Distribution(
+    protocols={
+        Protocol.DNSCRYPT: 35,
+        Protocol.DOH: 35,
+        Protocol.DNSCRYPT_RELAY: 10,
+        Protocol.PLAIN: 5,
+        Protocol.DOT: 5,
+        Protocol.DOQ: 5,
+        Protocol.DOH_TARGET: 3,
+        Protocol.DOH_RELAY: 2,
+    },
+    hashes={0: 30, 1: 60, 2: 10},
+    bootstrap_ips={0: 70, 1: 20, 2: 10},
+    ports={0: 70, 443: 20, 8443: 10},
+    ipv6=0.2,
+    options=0.5,
+)
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789'
+TLDS = ['com', 'net', 'org', 'io', 'de', 'ch', 'fr', 'nl', 'se', 'jp']
+PATHS = ['/dns-query', '/dns-query', '/dns-query', '/resolve', '/query', '/family']
+WRITE_BATCH_SIZE = 1024
+
+
+class Weighted:
+
+    def __init__(self, weights):
+        if not weights or sum(weights.values()) <= 0:
+            raise ValueError('Expected at least one positive weight')
+        self.values = list(weights)
+        self.cum_weights = list(accumulate(weights.values()))
+
+    def choose(self, generator):
+        return generator.choices(self.values, cum_weights=self.cum_weights)[0]
+
+
+def parse_weights(text, convert=int):
+    weights = {}
+    for item in text.split(','):
+        key, _, weight = item.partition('=')
+        try:
+            weights[convert(key.strip())] = float(weight)
+        except (KeyError, ValueError) as e:
+            raise ValueError('Invalid weight <%s>' % item, e)
+    return weights
+
+
+def protocol_from_name(name):
+    return Protocol[name.upper()]
+
+
+class CorpusGenerator:
+
+    def __init__(self, seed=0, distribution=DEFAULT_DISTRIBUTION):
+        self._random = random.Random(seed)
+        self._distribution = distribution
+        self._protocols = Weighted(distribution.protocols)
+        self._hashes = Weighted(distribution.hashes)
+        self._bootstrap_ips = Weighted(distribution.bootstrap_ips)
+        self._ports = Weighted(distribution.ports)
+        self._prepare = {
+            Protocol.PLAIN: lambda: prepare_plain(self.address(), self.options()),
+            Protocol.DNSCRYPT: lambda: prepare_dnscrypt(self.address(), self.hash(),
+                                                        '2.dnscrypt-cert.%s' % self.domain(), self.options()),
+            Protocol.DOH: lambda: prepare_doh(self.address(), self.hashes(), self.hostname('doh'), self.path(),
+                                              self.options(), self.bootstrap_ips()),
+            Protocol.DOT: lambda: prepare_dot(self.address(), self.hashes(), self.hostname('dot'), self.options(),
+                                              self.bootstrap_ips()),
+            Protocol.DOQ: lambda: prepare_doq(self.address(), self.hashes(), self.hostname('doq'), self.options(),
+                                              self.bootstrap_ips()),
+            Protocol.DOH_TARGET: lambda: prepare_doh_target(self.hostname('odoh'), self.path(), self.options()),
+            Protocol.DNSCRYPT_RELAY: lambda: prepare_dnscrypt_relay(self.address()),
+            Protocol.DOH_RELAY: lambda: prepare_doh_relay(self.address(), self.hashes(), self.hostname('odoh-relay'),
+                                                          self.path(), self.options(), self.bootstrap_ips()),
+        }
+
+    def label(self, minimum=3, maximum=16):
+        length = minimum + int(self._random.random() * (maximum - minimum + 1))
+        return ''.join(self._random.choices(ALPHABET, k=length))
+
+    def domain(self):
+        return '%s.%s' % (self.label(), TLDS[int(self._random.random() * len(TLDS))])
+
+    def hostname(self, prefix):
+        return '%s.%s' % (prefix, self.domain())
+
+    def path(self):
+        return PATHS[int(self._random.random() * len(PATHS))]
+
+    def ipv4(self):
+        return '%d.%d.%d.%d' % tuple(self._random.getrandbits(32).to_bytes(4, 'big'))
+
+    def ipv6(self):
+        value = self._random.getrandbits(128)
+        return '[%s]' % ':'.join('%x' % (value >> shift & 0xffff) for shift in range(112, -1, -16))
+
+    def address(self):
+        address = self.ipv6() if self._random.random() < self._distribution.ipv6 else self.ipv4()
+        port = self._ports.choose(self._random)
+        return '%s:%d' % (address, port) if port else address
+
+    def hash(self):
+        while True:
+            value = self._random.getrandbits(256).to_bytes(32, 'big')
+            try:
+                value.decode('utf-8')
+            except UnicodeDecodeError:
+                return value.hex()
+
+    def hashes(self):
+        return [self.hash() for _ in range(self._hashes.choose(self._random))]
+
+    def bootstrap_ips(self):
+        return [self.ipv4() for _ in range(self._bootstrap_ips.choose(self._random))]
+
+    def options(self):
+        return [option for option in Option if self._random.random() < self._distribution.options]
+
+    def parameter(self):
+        return self._prepare[self._protocols.choose(self._random)]()
+
+    def parameters(self, count):
+        for _ in range(count):
+            yield self.parameter()
+
+    def stamps(self, count):
+        buffer = bytearray()
+        for _ in range(count):
+            yield build_into(buffer, self.parameter())
+
+
+def generate(count, seed=0, distribution=DEFAULT_DISTRIBUTION):
+    return CorpusGenerator(seed, distribution).stamps(count)
+
+
+def write_corpus(file, count, seed=0, distribution=DEFAULT_DISTRIBUTION):
+    lines = []
+    for stamp in generate(count, seed, distribution):
+        lines.append(stamp)
+        if len(lines) == WRITE_BATCH_SIZE:
+            lines.append('')
+            file.write('\n'.join(lines))
+            lines = []
+    if lines:
+        lines.append('')
+        file.write('\n'.join(lines))
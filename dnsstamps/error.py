@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+from collections import namedtuple
+
+INVALID_BASE64 = 'invalid_base64'
+TRUNCATED = 'truncated'
+UNKNOWN_PROTOCOL = 'unknown_protocol'
+INVALID_TEXT = 'invalid_text'
+
+ParseFailure = namedtuple('ParseFailure', ['code', 'field', 'offset', 'message'])
+
+
+class StampError(Exception):
+    code = None
+    field = None
+    offset = None
+
+    def failure(self):
+        return ParseFailure(self.code, self.field, self.offset, self.args[0])
+
+
+class UnpackError(StampError):
+    code = INVALID_BASE64
+
+
+class ProtocolError(StampError):
+    code = UNKNOWN_PROTOCOL
+    field = 'protocol'
+
+
+class OptionsError(StampError):
+    code = TRUNCATED
+    field = 'flags'
+
+
+class TextError(StampError):
+    code = TRUNCATED
+
+
+class RawError(StampError):
+    code = TRUNCATED
+
+
+class EntryError(StampError):
+    name = None
+    line = None
+
+
+def stamp_error(error_class, message, cause, offset, code=None):
+    error = error_class(message, cause)
+    error.offset = offset
+    if code is not None:
+        error.code = code
+    return error
+
+
+def entry_error(message, cause, name, line=None):
+    if not isinstance(cause, StampError):
+        return Exception(message, cause)
+    error = EntryError(message, cause)
+    error.code, error.field, error.offset = cause.code, cause.field, cause.offset
+    error.name, error.line = name, line
+    return error
@@ -1,130 +1,65 @@
 #!/usr/bin/env python
 
-from dnsstamps import Option
-from dnsstamps import Parameter
-from dnsstamps import Protocol
+from time import perf_counter
+
+from dnsstamps import OptionFlag
 from dnsstamps import build
+from dnsstamps import metrics
+from dnsstamps.parameter import PARAMETER_TYPES
+from dnsstamps.schema import OPTIONS
+from dnsstamps.schema import RAW_ARRAY
+from dnsstamps.schema import TEXT_ARRAY
+from dnsstamps.schema import compile_schemas
 
 
 def print_options(parameter):
-    print('DNSSEC: %s' % ('yes' if Option.DNSSEC in parameter.options else 'no'))
-    print('No logs: %s' % ('yes' if Option.NO_LOGS in parameter.options else 'no'))
-    print('No filter: %s' % ('yes' if Option.NO_FILTERS in parameter.options else 'no'))
-
-
-def print_plain(parameter):
-    print('Plain DNS stamp')
-    print('===============')
-    print('')
-    print_options(parameter)
-    print('IP Address: %s' % parameter.address)
-    print('')
-    print(build(parameter))
-
-
-def print_dnscrypt(parameter):
-    print('DNSCrypt DNS stamp')
-    print('==================')
-    print('')
-    print_options(parameter)
-    print('IP Address: %s' % parameter.address)
-    print('Public key: %s' % parameter.public_key)
-    print('Provider name: %s' % parameter.provider_name)
-    print('')
-    print(build(parameter))
-
-
-def print_doh(parameter):
-    print('DoH DNS stamp')
-    print('=============')
-    print('')
-    print_options(parameter)
-    print('IP Address: %s' % parameter.address)
-    print('Hashes: %s' % parameter.hashes)
-    print('Hostname: %s' % parameter.hostname)
-    print('Path: %s' % parameter.path)
-    print('Bootstrap IPs: %s' % parameter.bootstrap_ips)
-    print('')
-    print(build(parameter))
-
-
-def print_dot(parameter):
-    print('DoT DNS stamp')
-    print('=============')
-    print('')
-    print_options(parameter)
-    print('IP Address: %s' % parameter.address)
-    print('Hostname: %s' % parameter.hostname)
-    print('Hashes: %s' % parameter.hashes)
-    print('Bootstrap IPs: %s' % parameter.bootstrap_ips)
-    print('')
-    print(build(parameter))
-
-
-def print_doq(parameter):
-    print('DoQ DNS stamp')
-    print('=============')
-    print('')
-    print_options(parameter)
-    print('IP Address: %s' % parameter.address)
-    print('Hostname: %s' % parameter.hostname)
-    print('Hashes: %s' % parameter.hashes)
-    print('Bootstrap IPs: %s' % parameter.bootstrap_ips)
-    print('')
-    print(build(parameter))
-
-
-def print_doh_target(parameter):
-    print('DoH Target DNS stamp')
-    print('====================')
-    print('')
-    print_options(parameter)
-    print('Hostname: %s' % parameter.hostname)
-    print('Path: %s' % parameter.path)
-    print('')
-    print(build(parameter))
-
-
-def print_dnscrypt_relay(parameter):
-    print('DNSCrypt DNS Relay Stamp')
-    print('========================')
-    print('')
-    print('IP Address: %s' % parameter.address)
-    print('')
-    print(build(parameter))
-
-
-def print_doh_relay(parameter):
-    print('DoH Relay DNS stamp')
-    print('===================')
-    print('')
-    print_options(parameter)
-    print('IP Address: %s' % parameter.address)
-    print('Hashes: %s' % parameter.hashes)
-    print('Hostname: %s' % parameter.hostname)
-    print('Path: %s' % parameter.path)
-    print('Bootstrap IPs: %s' % parameter.bootstrap_ips)
-    print('')
-    print(build(parameter))
+    print('DNSSEC: %s' % ('yes' if parameter.flags & OptionFlag.DNSSEC else 'no'))
+    print('No logs: %s' % ('yes' if parameter.flags & OptionFlag.NO_LOGS else 'no'))
+    print('No filter: %s' % ('yes' if parameter.flags & OptionFlag.NO_FILTERS else 'no'))
+
+
+def compile_field_printer(field):
+    if field.kind == OPTIONS:
+        return print_options
+
+    if field.kind in (TEXT_ARRAY, RAW_ARRAY):
+        def print_field(parameter):
+            print('%s: %s' % (field.label, list(getattr(parameter, field.name))))
+    else:
+        def print_field(parameter):
+            print('%s: %s' % (field.label, getattr(parameter, field.name)))
+
+    return print_field
+
+
+def compile_printer(schema):
+    underline = '=' * len(schema.title)
+    printers = tuple(compile_field_printer(field) for field in schema.display or schema.fields)
+
+    def print_stamp(parameter):
+        print(schema.title)
+        print(underline)
+        print('')
+        for print_field in printers:
+            print_field(parameter)
+        print('')
+        print(build(parameter))
+
+    return print_stamp
+
+
+PRINTERS = compile_schemas(compile_printer)
 
 
 def format(parameter):
-    if not isinstance(parameter, Parameter):
+    if not isinstance(parameter, PARAMETER_TYPES):
         raise ValueError('Invalid parameter type %s' % type(parameter))
 
-    if parameter.protocol == Protocol.PLAIN:
-        return print_plain(parameter)
-    elif parameter.protocol == Protocol.DNSCRYPT:
-        return print_dnscrypt(parameter)
-    elif parameter.protocol == Protocol.DOH:
-        return print_doh(parameter)
-    elif parameter.protocol == Protocol.DOT:
-        return print_dot(parameter)
-    elif parameter.protocol == Protocol.DOQ:
-        return print_doq(parameter)
-    elif parameter.protocol == Protocol.DOH_TARGET:
-        return print_doh_target(parameter)
-    elif parameter.protocol == Protocol.DNSCRYPT_RELAY:
-        return print_dnscrypt_relay(parameter)
-    elif parameter.protocol == Protocol.DOH_RELAY:
-        return print_doh_relay(parameter)
+    recorder = metrics.active.get()
+    if recorder is None:
+        return PRINTERS[parameter.protocol](parameter)
+
+    start = perf_counter()
+    PRINTERS[parameter.protocol](parameter)
+    recorder.count('format', parameter.protocol)
+    recorder.time('format', perf_counter() - start)
@@ -1,4 +1,5 @@
 from .generator import build
+from .generator import build_into
 from .generator import create_dnscrypt
 from .generator import create_dnscrypt_relay
 from .generator import create_doh
@@ -3,53 +3,60 @@
 import base64
 import binascii
 import struct
+from operator import attrgetter
+from time import perf_counter
 
-from dnsstamps import Option
 from dnsstamps import Parameter
 from dnsstamps import Protocol
+from dnsstamps import metrics
+from dnsstamps.parameter import PARAMETER_TYPES
+from dnsstamps.schema import OPTIONS
+from dnsstamps.schema import RAW
+from dnsstamps.schema import RAW_ARRAY
+from dnsstamps.schema import TEXT
+from dnsstamps.schema import TEXT_ARRAY
+from dnsstamps.schema import compile_schemas
 
 
-def pack_protocol(protocol):
-    return struct.pack("<B", protocol.value)
+FLAGS = struct.Struct("<Q")
 
 
-def pack_options(options):
-    props = 0
-    if Option.DNSSEC in options:
-        props |= 1
-    if Option.NO_LOGS in options:
-        props |= (1 << 1)
-    if Option.NO_FILTERS in options:
-        props |= (1 << 2)
-    return struct.pack("<Q", props)
+def write_protocol(buffer, protocol):
+    buffer.append(protocol.value)
 
 
-def pack_text_array(array):
-    result = b''
+def write_flags(buffer, flags):
+    buffer += FLAGS.pack(flags)
+
+
+def write_text_array(buffer, array):
     last_item = len(array) - 1
     for i, text in enumerate(array):
-        result += pack_text(text, i != last_item)
-    return result
+        write_text(buffer, text, i != last_item)
 
 
-def pack_text(text, set_high_bit=False):
+def write_text(buffer, text, set_high_bit=False):
     length = len(text)
     if set_high_bit:
         length |= (1 << 7)
 
-    return struct.pack("<B", length) + text.encode('raw-unicode-escape')
+    buffer.append(length)
+    buffer += text.encode('raw-unicode-escape')
+
 
+def write_raw_array(buffer, array):
+    if len(array) == 0:
+        return write_raw(buffer, "")
 
-def pack_raw_array(array):
-    result = b''
     last_item = len(array) - 1
     for i, raw in enumerate(array):
-        result += pack_raw(raw, i != last_item)
-    return result
+        write_raw(buffer, raw, i != last_item)
 
 
-def pack_raw(raw, set_high_bit=False):
-    if isinstance(raw, str):
+def write_raw(buffer, raw, set_high_bit=False):
+    if raw is None:
+        raw = b''
+    elif isinstance(raw, str):
         raw = raw.replace(":", "").strip()
     binary = binascii.unhexlify(raw)
 
@@ -57,125 +64,81 @@ def pack_raw(raw, set_high_bit=False):
     if set_high_bit:
         length |= (1 << 7)
 
-    return struct.pack("<B", length) + binary
+    buffer.append(length)
+    buffer += binary
 
 
 def create_stamp(payload):
     return "sdns://" + base64.urlsafe_b64encode(payload).decode("utf-8").rstrip("=")
 
 
-def build_plain(parameter):
-    return create_stamp(
-        pack_protocol(parameter.protocol) +
-        pack_options(parameter.options) +
-        pack_text(parameter.address)
-    )
-
-
-def build_dnscrypt(parameter):
-    return create_stamp(
-        pack_protocol(parameter.protocol) +
-        pack_options(parameter.options) +
-        pack_text(parameter.address) +
-        pack_raw(parameter.public_key) +
-        pack_text(parameter.provider_name)
-    )
-
-
-def build_doh(parameter):
-    if len(parameter.hashes) == 0:
-        parameter.hashes.append("")
-
-    return create_stamp(
-        pack_protocol(parameter.protocol) +
-        pack_options(parameter.options) +
-        pack_text(parameter.address) +
-        pack_raw_array(parameter.hashes) +
-        pack_text(parameter.hostname) +
-        pack_text(parameter.path) +
-        pack_text_array(parameter.bootstrap_ips)
-    )
-
-
-def build_dot(parameter):
-    if len(parameter.hashes) == 0:
-        parameter.hashes.append("")
-
-    return create_stamp(
-        pack_protocol(parameter.protocol) +
-        pack_options(parameter.options) +
-        pack_text(parameter.address) +
-        pack_raw_array(parameter.hashes) +
-        pack_text(parameter.hostname) +
-        pack_text_array(parameter.bootstrap_ips)
-    )
-
-
-def build_doq(parameter):
-    if len(parameter.hashes) == 0:
-        parameter.hashes.append("")
-
-    return create_stamp(
-        pack_protocol(parameter.protocol) +
-        pack_options(parameter.options) +
-        pack_text(parameter.address) +
-        pack_raw_array(parameter.hashes) +
-        pack_text(parameter.hostname) +
-        pack_text_array(parameter.bootstrap_ips)
-    )
-
-
-def build_doh_target(parameter):
-    return create_stamp(
-        pack_protocol(parameter.protocol) +
-        pack_options(parameter.options) +
-        pack_text(parameter.hostname) +
-        pack_text(parameter.path)
-    )
-
-
-def build_dnscrypt_relay(parameter):
-    return create_stamp(
-        pack_protocol(parameter.protocol) +
-        pack_text(parameter.address)
-    )
-
-
-def build_doh_relay(parameter):
-    if len(parameter.hashes) == 0:
-        parameter.hashes.append("")
-
-    return create_stamp(
-        pack_protocol(parameter.protocol) +
-        pack_options(parameter.options) +
-        pack_text(parameter.address) +
-        pack_raw_array(parameter.hashes) +
-        pack_text(parameter.hostname) +
-        pack_text(parameter.path) +
-        pack_text_array(parameter.bootstrap_ips)
-    )
+WRITERS = {
+    OPTIONS: write_flags,
+    TEXT: write_text,
+    RAW: write_raw,
+    TEXT_ARRAY: write_text_array,
+    RAW_ARRAY: write_raw_array,
+}
 
 
-def build(parameter):
-    if not isinstance(parameter, Parameter):
+def compile_encoder(schema):
+    steps = tuple((attrgetter(field.name), WRITERS[field.kind]) for field in schema.fields)
+
+    def encode(buffer, parameter):
+        write_protocol(buffer, parameter.protocol)
+        for get, write in steps:
+            write(buffer, get(parameter))
+
+    return encode
+
+
+ENCODERS = compile_schemas(compile_encoder)
+
+
+def build_into(buffer, parameter):
+    if not isinstance(parameter, PARAMETER_TYPES):
         raise ValueError('Invalid parameter type %s' % type(parameter))
 
-    if parameter.protocol == Protocol.PLAIN:
-        return build_plain(parameter)
-    elif parameter.protocol == Protocol.DNSCRYPT:
-        return build_dnscrypt(parameter)
-    elif parameter.protocol == Protocol.DOH:
-        return build_doh(parameter)
-    elif parameter.protocol == Protocol.DOT:
-        return build_dot(parameter)
-    elif parameter.protocol == Protocol.DOQ:
-        return build_doq(parameter)
-    elif parameter.protocol == Protocol.DOH_TARGET:
-        return build_doh_target(parameter)
-    elif parameter.protocol == Protocol.DNSCRYPT_RELAY:
-        return build_dnscrypt_relay(parameter)
-    elif parameter.protocol == Protocol.DOH_RELAY:
-        return build_doh_relay(parameter)
+    recorder = metrics.active.get()
+    if recorder is not None:
+        return build_into_instrumented(recorder, buffer, parameter)
+
+    del buffer[:]
+    ENCODERS[parameter.protocol](buffer, parameter)
+    return create_stamp(buffer)
+
+
+def build_into_instrumented(recorder, buffer, parameter):
+    try:
+        start = perf_counter()
+        del buffer[:]
+        ENCODERS[parameter.protocol](buffer, parameter)
+        encoded = perf_counter()
+        stamp = create_stamp(buffer)
+        done = perf_counter()
+    except Exception as e:
+        recorder.error('build', e)
+        raise
+
+    recorder.count('build', parameter.protocol, len(buffer))
+    recorder.time('build.encode', encoded - start)
+    recorder.time('build.base64', done - encoded)
+    return stamp
+
+
+def build_reusing(buffer, parameter):
+    if isinstance(parameter, Parameter):
+        stamp = parameter.stamp
+        if stamp is not None:
+            recorder = metrics.active.get()
+            if recorder is not None:
+                recorder.cached('build', parameter.protocol)
+            return stamp
+    return build_into(buffer, parameter)
+
+
+def build(parameter):
+    return build_reusing(bytearray(), parameter)
 
 
 def prepare_plain(address, options=None):
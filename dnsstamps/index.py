@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+import hashlib
+from collections import namedtuple
+
+from dnsstamps.error import entry_error
+from dnsstamps.parser.parser import parse_stamp
+from dnsstamps.parser.state import State
+
+FIELDS = ['protocol', 'flags', 'address', 'public_key', 'provider_name', 'hashes', 'hostname', 'path',
+          'bootstrap_ips']
+ARRAY_FIELDS = {'hashes', 'bootstrap_ips'}
+
+Difference = namedtuple('Difference', ['field', 'old', 'new'])
+Change = namedtuple('Change', ['old', 'new', 'differences'])
+
+
+class Changes(namedtuple('Changes', ['added', 'removed', 'changed', 'unchanged', 'errors'])):
+    __slots__ = ()
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+
+def digest(stamp):
+    return hashlib.blake2b(stamp.replace('sdns://', '').encode(), digest_size=16).digest()
+
+
+def diff(old, new):
+    differences = []
+    for field in FIELDS:
+        old_value = getattr(old, field)
+        new_value = getattr(new, field)
+        if field in ARRAY_FIELDS:
+            old_value = tuple(old_value)
+            new_value = tuple(new_value)
+        if old_value != new_value:
+            differences.append(Difference(field, old_value, new_value))
+    return differences
+
+
+def entries_by_digest(stamps):
+    for stamp in stamps:
+        yield digest(stamp).hex(), stamp
+
+
+def entries_by_name(entries):
+    counts = {}
+    for entry in entries:
+        count = counts[entry.name] = counts.get(entry.name, 0) + 1
+        yield entry.name if count == 1 else '%s#%d' % (entry.name, count), entry.stamp
+
+
+class StampIndex:
+
+    def __init__(self, entries=(), frozen=False, skip_errors=False):
+        self._frozen = frozen
+        self._digests = {}
+        self._parameters = {}
+        self.update(entries, skip_errors)
+
+    def __len__(self):
+        return len(self._parameters)
+
+    def __contains__(self, key):
+        return key in self._parameters
+
+    def __getitem__(self, key):
+        return self._parameters[key]
+
+    def keys(self):
+        return list(self._parameters)
+
+    def items(self):
+        return list(self._parameters.items())
+
+    def update(self, entries, skip_errors=False):
+        state = State()
+        digests = {}
+        added = {}
+        changed = {}
+        errors = {}
+        unchanged = 0
+        seen = set()
+
+        for key, stamp in entries:
+            seen.add(key)
+            stamp_digest = digest(stamp)
+            if self._digests.get(key) == stamp_digest:
+                unchanged += 1
+                continue
+
+            try:
+                parameter = parse_stamp(state, stamp, self._frozen)
+            except Exception as e:
+                if not skip_errors:
+                    raise entry_error('Unable to parse stamp of <%s>' % key, e, key)
+                errors[key] = e
+                continue
+
+            old = self._parameters.get(key)
+            if old is None:
+                added[key] = parameter
+            else:
+                changed[key] = Change(old, parameter, diff(old, parameter))
+            digests[key] = stamp_digest
+
+        removed = {key: parameter for key, parameter in self._parameters.items() if key not in seen}
+        for key in removed:
+            del self._digests[key]
+            del self._parameters[key]
+        self._digests.update(digests)
+        self._parameters.update(added)
+        self._parameters.update((key, change.new) for key, change in changed.items())
+
+        return Changes(added, removed, changed, unchanged, errors)
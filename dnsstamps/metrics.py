@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+from collections import Counter
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+active = ContextVar('dnsstamps.metrics', default=None)
+
+
+def error_kind(error):
+    if error.args and isinstance(error.args[0], str):
+        return error.args[0]
+    return type(error).__name__
+
+
+class Metrics:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = Counter()
+        self.bytes = Counter()
+        self.seconds = Counter()
+        self.errors = defaultdict(Counter)
+        self.protocols = defaultdict(Counter)
+
+    def count(self, operation, protocol, size=0):
+        self.calls[operation] += 1
+        if size:
+            self.bytes[operation] += size
+        self.protocols[operation][protocol.name] += 1
+
+    def cached(self, operation, protocol):
+        self.count(operation, protocol)
+        self.calls[operation + '.cached'] += 1
+
+    def time(self, stage, seconds):
+        self.seconds[stage] += seconds
+
+    def error(self, operation, error):
+        self.calls[operation] += 1
+        self.errors[operation][error_kind(error)] += 1
+
+    def snapshot(self):
+        return {
+            'calls': dict(self.calls),
+            'bytes': dict(self.bytes),
+            'seconds': dict(self.seconds),
+            'errors': {operation: dict(kinds) for operation, kinds in self.errors.items()},
+            'protocols': {operation: dict(protocols) for operation, protocols in self.protocols.items()},
+        }
+
+
+def enable(metrics=None):
+    recorder = Metrics() if metrics is None else metrics
+    active.set(recorder)
+    return recorder
+
+
+def disable():
+    active.set(None)
+
+
+def snapshot():
+    recorder = active.get()
+    return {} if recorder is None else recorder.snapshot()
+
+
+@contextmanager
+def instrument(metrics=None):
+    recorder = Metrics() if metrics is None else metrics
+    token = active.set(recorder)
+    try:
+        yield recorder
+    finally:
+        active.reset(token)
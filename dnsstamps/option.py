@@ -1,7 +1,34 @@
 from enum import Enum
+from enum import IntFlag
 
 
 class Option(Enum):
     DNSSEC = 1
     NO_LOGS = 2
     NO_FILTERS = 3
+
+
+class OptionFlag(IntFlag):
+    DNSSEC = 1
+    NO_LOGS = 1 << 1
+    NO_FILTERS = 1 << 2
+
+
+OPTION_FLAGS = [(option, int(OptionFlag[option.name])) for option in Option]
+OPTION_BITS = dict(OPTION_FLAGS)
+KNOWN_FLAGS = int(OptionFlag.DNSSEC | OptionFlag.NO_LOGS | OptionFlag.NO_FILTERS)
+
+
+def flags_from_options(options):
+    if isinstance(options, int):
+        return int(options)
+
+    flags = 0
+    for option in options:
+        bit = OPTION_BITS.get(option)
+        flags |= int(option) if bit is None else bit
+    return flags
+
+
+def options_from_flags(flags):
+    return [option for option, flag in OPTION_FLAGS if flags & flag]
@@ -1,11 +1,33 @@
+import re
+from collections import namedtuple
+
 from dnsstamps import Protocol
+from dnsstamps.error import StampError
+from dnsstamps.option import KNOWN_FLAGS
+from dnsstamps.option import flags_from_options
+from dnsstamps.option import options_from_flags
+
+CANONICAL_STAMP = re.compile(r'sdns://[A-Za-z0-9_-]*')
+CANONICAL_ENDINGS = {0: None, 2: 'AQgw', 3: 'AEIMQUYcgkosw048'}
+LIST_MUTATORS = ('append', 'extend', 'insert', 'remove', 'pop', 'clear', '__setitem__', '__delitem__', '__iadd__',
+                 '__imul__')
+
+
+def is_canonical(stamp):
+    if not CANONICAL_STAMP.fullmatch(stamp):
+        return False
+    remainder = (len(stamp) - 7) % 4
+    if remainder not in CANONICAL_ENDINGS:
+        return False
+    return remainder == 0 or stamp[-1] in CANONICAL_ENDINGS[remainder]
 
 
 class Parameter:
 
     def __init__(self):
         self._protocol = Protocol.PLAIN
-        self._options = []
+        self._flags = 0
+        self._options = None
         self._address = '127.0.0.1'
         self._public_key = b''
         self._provider_name = ''
@@ -13,6 +35,45 @@ class Parameter:
         self._hostname = ''
         self._path = ''
         self._bootstrap_ips = []
+        self._stamp = None
+        self._snapshot = None
+
+    def keep_stamp(self, stamp):
+        self._stamp = stamp
+        self._snapshot = (tuple(self._hashes), tuple(self._bootstrap_ips))
+
+    @property
+    def stamp(self):
+        stamp = self._stamp
+        if stamp is not None:
+            snapshot = (tuple(self._hashes), tuple(self._bootstrap_ips))
+            if snapshot != self._snapshot or not is_canonical(stamp):
+                self._stamp = stamp = None
+        return stamp
+
+    @property
+    def dirty(self):
+        return self.stamp is None
+
+    def to_tuple(self):
+        return (self._protocol.value, self.flags, self._address,
+                self._public_key, self._provider_name, tuple(self._hashes), self._hostname, self._path,
+                tuple(self._bootstrap_ips))
+
+    def freeze(self):
+        return FrozenParameter(self._protocol, self.flags, self._address, self._public_key,
+                               self._provider_name, tuple(self._hashes), self._hostname, self._path,
+                               tuple(self._bootstrap_ips))
+
+    @classmethod
+    def from_tuple(cls, values):
+        parameter = cls()
+        (protocol, parameter._flags, parameter._address, parameter._public_key, parameter._provider_name, hashes,
+         parameter._hostname, parameter._path, bootstrap_ips) = values
+        parameter._protocol = Protocol(protocol)
+        parameter._hashes = list(hashes)
+        parameter._bootstrap_ips = list(bootstrap_ips)
+        return parameter
 
     @property
     def protocol(self):
@@ -20,6 +81,7 @@ class Parameter:
 
     @protocol.setter
     def protocol(self, protocol):
+        self._stamp = None
         if isinstance(protocol, Protocol):
             self._protocol = protocol
         else:
@@ -27,11 +89,31 @@ class Parameter:
 
     @property
     def options(self):
-        return self._options
+        options = self._options
+        return OptionList(self) if options is None else options
 
     @options.setter
     def options(self, options):
-        self._options = options
+        self._stamp = None
+        if isinstance(options, int):
+            self._flags = int(options)
+            self._options = None
+        elif not (isinstance(options, OptionList) and options._owner is self):
+            self._flags = self.flags & ~KNOWN_FLAGS
+            self._options = options
+
+    @property
+    def flags(self):
+        options = self._options
+        if options is None:
+            return self._flags
+        return self._flags & ~KNOWN_FLAGS | flags_from_options(options)
+
+    @flags.setter
+    def flags(self, flags):
+        self._stamp = None
+        self._flags = int(flags)
+        self._options = None
 
     @property
     def address(self):
@@ -39,6 +121,7 @@ class Parameter:
 
     @address.setter
     def address(self, address):
+        self._stamp = None
         self._address = address
 
     @property
@@ -47,6 +130,7 @@ class Parameter:
 
     @public_key.setter
     def public_key(self, public_key):
+        self._stamp = None
         self._public_key = public_key
 
     @property
@@ -55,6 +139,7 @@ class Parameter:
 
     @provider_name.setter
     def provider_name(self, provider_name):
+        self._stamp = None
         self._provider_name = provider_name
 
     @property
@@ -63,6 +148,7 @@ class Parameter:
 
     @hashes.setter
     def hashes(self, hashes):
+        self._stamp = None
         self._hashes = hashes
 
     @property
@@ -71,6 +157,7 @@ class Parameter:
 
     @hostname.setter
     def hostname(self, hostname):
+        self._stamp = None
         self._hostname = hostname
 
     @property
@@ -79,6 +166,7 @@ class Parameter:
 
     @path.setter
     def path(self, path):
+        self._stamp = None
         self._path = path
 
     @property
@@ -87,4 +175,134 @@ class Parameter:
 
     @bootstrap_ips.setter
     def bootstrap_ips(self, bootstrap_ips):
+        self._stamp = None
         self._bootstrap_ips = bootstrap_ips
+
+
+class OptionList(list):
+    __slots__ = ('_owner',)
+
+    def __init__(self, owner):
+        super().__init__(options_from_flags(owner.flags))
+        self._owner = owner
+
+
+def write_back(name):
+    method = getattr(list, name)
+
+    def mutate(self, *args):
+        result = method(self, *args)
+        owner = self._owner
+        owner.flags = owner.flags & ~KNOWN_FLAGS | flags_from_options(self)
+        return result
+
+    return mutate
+
+
+for mutator in LIST_MUTATORS:
+    setattr(OptionList, mutator, write_back(mutator))
+
+
+def lazy_property(name):
+    base = getattr(Parameter, name)
+
+    def getter(self):
+        if name in self._pending:
+            decode, span = self._pending[name]
+            try:
+                value = decode(self._payload, span)
+            except StampError as e:
+                e.field = name
+                raise
+            del self._pending[name]
+            setattr(self, '_' + name, value)
+            if self._snapshot is not None:
+                if name == 'hashes':
+                    self._snapshot = (tuple(value), self._snapshot[1])
+                elif name == 'bootstrap_ips':
+                    self._snapshot = (self._snapshot[0], tuple(value))
+        return base.fget(self)
+
+    def setter(self, value):
+        self._pending.pop(name, None)
+        base.fset(self, value)
+
+    return property(getter, setter)
+
+
+class LazyParameter(Parameter):
+
+    def __init__(self, payload):
+        super().__init__()
+        self._payload = payload
+        self._pending = {}
+
+    address = lazy_property('address')
+    public_key = lazy_property('public_key')
+    provider_name = lazy_property('provider_name')
+    hashes = lazy_property('hashes')
+    hostname = lazy_property('hostname')
+    path = lazy_property('path')
+    bootstrap_ips = lazy_property('bootstrap_ips')
+
+    def defer(self, name, decode, span):
+        self._pending[name] = (decode, span)
+
+    def span(self, name):
+        pending = self._pending.get(name)
+        return None if pending is None else pending[1]
+
+    def load(self):
+        for name in list(self._pending):
+            getattr(self, name)
+
+    def to_tuple(self):
+        self.load()
+        return super().to_tuple()
+
+    def freeze(self):
+        self.load()
+        return super().freeze()
+
+    def __getstate__(self):
+        self.load()
+        state = self.__dict__.copy()
+        state['_payload'] = b''
+        return state
+
+
+class FrozenParameter(namedtuple('FrozenParameter',
+                                 ['protocol', 'flags', 'address', 'public_key', 'provider_name', 'hashes',
+                                  'hostname', 'path', 'bootstrap_ips'],
+                                 defaults=[Protocol.PLAIN, 0, '127.0.0.1', b'', '', (), '', '', ()])):
+    __slots__ = ()
+
+    @property
+    def options(self):
+        return tuple(options_from_flags(self.flags))
+
+    def to_tuple(self):
+        return (self.protocol.value, self.flags, self.address, self.public_key, self.provider_name, self.hashes,
+                self.hostname, self.path, self.bootstrap_ips)
+
+    def thaw(self):
+        parameter = Parameter()
+        parameter.protocol = self.protocol
+        parameter.flags = self.flags
+        parameter.address = self.address
+        parameter.public_key = self.public_key
+        parameter.provider_name = self.provider_name
+        parameter.hashes = list(self.hashes)
+        parameter.hostname = self.hostname
+        parameter.path = self.path
+        parameter.bootstrap_ips = list(self.bootstrap_ips)
+        return parameter
+
+    @classmethod
+    def from_tuple(cls, values):
+        (protocol, flags, address, public_key, provider_name, hashes, hostname, path, bootstrap_ips) = values
+        return cls(Protocol(protocol), flags, address, public_key, provider_name, tuple(hashes), hostname, path,
+                   tuple(bootstrap_ips))
+
+
+PARAMETER_TYPES = (Parameter, FrozenParameter)
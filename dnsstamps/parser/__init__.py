@@ -1 +1,10 @@
+from .parser import Header
 from .parser import parse
+from .parser import parse_many
+from .parser import peek
+from .parser import peek_many
+from .parser import try_parse
+from .parser import try_parse_many
+from .parallel import parse_parallel
+from .scan import scan_buffer
+from .scan import scan_file
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from dnsstamps import FrozenParameter
+from dnsstamps import Parameter
+from dnsstamps.parser.parser import parse_many
+
+MIN_CHUNK_SIZE = 64
+MAX_CHUNK_SIZE = 4096
+
+
+def parse_chunk(stamps):
+    return [result.to_tuple() if isinstance(result, Parameter) else result[1]
+            for result in parse_many(stamps, yield_errors=True)]
+
+
+def initial_chunk_size(stamps, workers):
+    try:
+        size = len(stamps) // (workers * 4)
+    except TypeError:
+        return MIN_CHUNK_SIZE
+    return max(MIN_CHUNK_SIZE, min(size, MAX_CHUNK_SIZE))
+
+
+def parse_parallel(stamps, workers=None, yield_errors=False, frozen=False):
+    restore = FrozenParameter.from_tuple if frozen else Parameter.from_tuple
+    workers = workers or os.cpu_count() or 1
+    chunk_size = initial_chunk_size(stamps, workers)
+    stamps = iter(stamps)
+    pending = deque()
+    offset = 0
+
+    executor = ProcessPoolExecutor(workers)
+    try:
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(islice(stamps, chunk_size))
+                if not chunk:
+                    break
+                pending.append((offset, executor.submit(parse_chunk, chunk)))
+                offset += len(chunk)
+                chunk_size = min(chunk_size * 2, MAX_CHUNK_SIZE)
+
+            if not pending:
+                break
+
+            start, future = pending.popleft()
+            for index, result in enumerate(future.result(), start):
+                if isinstance(result, Exception):
+                    if not yield_errors:
+                        raise result
+                    yield index, result
+                else:
+                    yield restore(result)
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -2,197 +2,550 @@
 
 import base64
 import binascii
-import struct
+import codecs
+import re
+from collections import namedtuple
+from time import perf_counter
 
-from dnsstamps import Option
+from dnsstamps import LazyParameter
 from dnsstamps import Parameter
 from dnsstamps import Protocol
+from dnsstamps import metrics
+from dnsstamps.error import INVALID_BASE64
+from dnsstamps.error import INVALID_TEXT
+from dnsstamps.error import TRUNCATED
+from dnsstamps.error import UNKNOWN_PROTOCOL
+from dnsstamps.error import OptionsError
+from dnsstamps.error import ParseFailure
+from dnsstamps.error import ProtocolError
+from dnsstamps.error import RawError
+from dnsstamps.error import StampError
+from dnsstamps.error import TextError
+from dnsstamps.error import UnpackError
+from dnsstamps.error import stamp_error
 from dnsstamps.parser.state import State
+from dnsstamps.schema import FLAGS
+from dnsstamps.schema import OPTIONS
+from dnsstamps.schema import RAW
+from dnsstamps.schema import RAW_ARRAY
+from dnsstamps.schema import TEXT
+from dnsstamps.schema import SCHEMAS
+from dnsstamps.schema import TEXT_ARRAY
+from dnsstamps.schema import compile_schemas
 
 
-def create_state_for_stamp(stamp):
+Header = namedtuple('Header', ['protocol', 'flags'])
+
+HEADER_LENGTH = 12
+PROTOCOLS = {protocol.value: protocol for protocol in Protocol}
+PROTOCOLS_WITH_OPTIONS = {schema.protocol for schema in SCHEMAS if FLAGS in schema.fields}
+BASE64URL = re.compile(r'[A-Za-z0-9_-]*')
+UNPACK_FAILURE = ParseFailure(INVALID_BASE64, None, None, 'Unable to unpack stamp')
+
+
+def unpack_stamp(state, stamp):
+    try:
+        state.reset(base64.urlsafe_b64decode(stamp.replace('sdns://', '') + '==='))
+        return state
+    except Exception as e:
+        raise UnpackError('Unable to unpack stamp', e)
+
+
+def unpack_span(state, span):
     try:
-        state = State()
-        state.data = base64.urlsafe_b64decode(stamp.replace('sdns://', '') + '===')
+        state.reset(base64.urlsafe_b64decode(bytes(span) + b'==='))
         return state
     except Exception as e:
-        raise Exception('Unable to unpack stamp', e)
+        raise UnpackError('Unable to unpack stamp', e)
+
+
+def unpack_header(state, stamp):
+    if stamp.startswith('sdns://'):
+        stamp = stamp[7:7 + HEADER_LENGTH]
+    else:
+        stamp = stamp.replace('sdns://', '')[:HEADER_LENGTH]
+    return unpack_stamp(state, stamp)
+
+
+def create_state_for_stamp(stamp):
+    return unpack_stamp(State(), stamp)
 
 
 def consume_protocol(state):
+    offset = state.offset
     try:
-        raw_protocol = struct.unpack('<B', state.data[:1])[0]
-        state.data = state.data[1:]
-        return Protocol(raw_protocol)
+        raw_protocol = state.data[offset]
+        state.offset = offset + 1
+        return PROTOCOLS.get(raw_protocol) or Protocol(raw_protocol)
+    except IndexError as e:
+        raise stamp_error(ProtocolError, 'Unable to consume protocol', e, offset, TRUNCATED)
     except Exception as e:
-        raise Exception('Unable to consume protocol', e)
+        raise stamp_error(ProtocolError, 'Unable to consume protocol', e, offset)
 
 
 def consume_options(state):
+    offset = state.offset
     try:
-        raw_options = struct.unpack('<Q', state.data[:8])[0]
-
-        options = []
-        if raw_options & 1:
-            options.append(Option.DNSSEC)
-        if raw_options & (1 << 1):
-            options.append(Option.NO_LOGS)
-        if raw_options & (1 << 2):
-            options.append(Option.NO_FILTERS)
-
-        state.data = state.data[8:]
-        return options
+        if state.remaining() < 8:
+            raise ValueError('Expected 8 bytes, got %d' % state.remaining())
+        state.offset = offset + 8
+        return int.from_bytes(state.data[offset:offset + 8], 'little')
     except Exception as e:
-        raise Exception('Unable to consume options', e)
+        raise stamp_error(OptionsError, 'Unable to consume options', e, offset)
 
 
 def is_next_bytes_high_bit_set(state):
-    byte = struct.unpack('<B', state.data[:1])[0]
-    return byte & (1 << 7)
+    return state.data[state.offset] & 0x80
 
 
 def unpack_len(state):
-    length = struct.unpack('<B', state.data[:1])[0]
-    return length & ~(1 << 7)
+    return state.data[state.offset] & 0x7f
 
 
-def consume_text(state):
+def field_end(data, offset):
+    end = offset + 1 + (data[offset] & 0x7f)
+    if end > len(data):
+        raise IndexError('Expected %d bytes, got %d' % (end - offset - 1, len(data) - offset - 1))
+    return end
+
+
+def consume_text(state, item=False):
+    offset = state.offset
     try:
-        length = unpack_len(state)
+        data = state.data
+        state.offset = end = field_end(data, offset)
+        if data[offset] & 0x80 and not item:
+            state.canonical = False
 
-        if length == 0:
-            state.data = state.data[1:]
+        if end == offset + 1:
             return ""
 
-        text = state.data[1:length + 1].decode('raw-unicode-escape')
-        state.data = state.data[length + 1:]
+        text = codecs.decode(data[offset + 1:end], 'raw-unicode-escape')
+        if len(text) != end - offset - 1:
+            state.canonical = False
         return text
+    except IndexError as e:
+        raise stamp_error(TextError, 'Unable to consume text', e, offset)
     except Exception as e:
-        raise Exception('Unable to consume text', e)
+        raise stamp_error(TextError, 'Unable to consume text', e, offset, INVALID_TEXT)
 
 
 def consume_text_array(state):
     items = []
+    data = state.data
 
-    done = len(state.data) == 0
-    while not done:
-        done = not is_next_bytes_high_bit_set(state)
-        item = consume_text(state)
-        if item is None:
-            break
-        items.append(item)
+    done = state.remaining() <= 0
+    try:
+        while not done:
+            done = not data[state.offset] & 0x80
+            items.append(consume_text(state, True))
+    except IndexError as e:
+        raise stamp_error(TextError, 'Unable to consume text', e, state.offset)
     return items
 
 
-def consume_raw(state):
+def consume_raw(state, item=False):
+    offset = state.offset
     try:
-        length = unpack_len(state)
+        data = state.data
+        end = field_end(data, offset)
+        if data[offset] & 0x80 and not item:
+            state.canonical = False
 
-        if length == 0:
-            state.data = state.data[1:]
+        if end == offset + 1:
+            state.offset = end
             return None
 
-        bytes = state.data[1:length + 1]
+        raw = data[offset + 1:end]
         try:
-            bytes.decode('utf-8')
+            str(raw, 'utf-8')
+            state.canonical = False
             return None
-        except:
-            state.data = state.data[length + 1:]
-            return binascii.hexlify(bytes)
+        except UnicodeDecodeError:
+            state.offset = end
+            return binascii.hexlify(raw)
     except Exception as e:
-        raise Exception('Unable to consume raw', e)
+        raise stamp_error(RawError, 'Unable to consume raw', e, offset)
 
 
 def consume_raw_array(state):
     items = []
+    data = state.data
 
-    done = len(state.data) == 0
-    while not done:
-        done = not is_next_bytes_high_bit_set(state)
-        item = consume_raw(state)
-        if item is None:
-            break
-        items.append(item)
+    done = state.remaining() <= 0
+    try:
+        while not done:
+            offset = state.offset
+            done = not data[offset] & 0x80
+            item = consume_raw(state, True)
+            if item is None:
+                if items or data[offset]:
+                    state.canonical = False
+                break
+            items.append(item)
+    except IndexError as e:
+        raise stamp_error(RawError, 'Unable to consume raw', e, state.offset)
     return items
 
 
-def parse_plain(state, parameter):
-    parameter.options = consume_options(state)
-    parameter.address = consume_text(state)
+def skip_text(state, item=False):
+    offset = state.offset
+    try:
+        data = state.data
+        state.offset = end = field_end(data, offset)
+        if data[offset] & 0x80 and not item or 0x5c in data[offset + 1:end]:
+            state.canonical = False
+        return offset + 1, end
+    except Exception as e:
+        raise stamp_error(TextError, 'Unable to consume text', e, offset)
 
 
-def parse_dnscrypt(state, parameter):
-    parameter.options = consume_options(state)
-    parameter.address = consume_text(state)
-    parameter.public_key = consume_raw(state)
-    parameter.provider_name = consume_text(state)
+def skip_text_array(state):
+    spans = []
+    data = state.data
 
+    done = state.remaining() <= 0
+    try:
+        while not done:
+            done = not data[state.offset] & 0x80
+            spans.append(skip_text(state, True))
+    except IndexError as e:
+        raise stamp_error(TextError, 'Unable to consume text', e, state.offset)
+    return spans
 
-def parse_doh(state, parameter):
-    parameter.options = consume_options(state)
-    parameter.address = consume_text(state)
-    parameter.hashes = consume_raw_array(state)
-    parameter.hostname = consume_text(state)
-    parameter.path = consume_text(state)
-    parameter.bootstrap_ips = consume_text_array(state)
 
+def skip_raw(state, item=False):
+    offset = state.offset
+    try:
+        data = state.data
+        end = field_end(data, offset)
+        if data[offset] & 0x80 and not item:
+            state.canonical = False
 
-def parse_dot(state, parameter):
-    parameter.options = consume_options(state)
-    parameter.address = consume_text(state)
-    parameter.hashes = consume_raw_array(state)
-    parameter.hostname = consume_text(state)
-    parameter.bootstrap_ips = consume_text_array(state)
+        if end == offset + 1:
+            state.offset = end
+            return None
 
+        try:
+            str(data[offset + 1:end], 'utf-8')
+            state.canonical = False
+            return None
+        except UnicodeDecodeError:
+            state.offset = end
+            return offset + 1, end
+    except Exception as e:
+        raise stamp_error(RawError, 'Unable to consume raw', e, offset)
 
-def parse_doq(state, parameter):
-    parameter.options = consume_options(state)
-    parameter.address = consume_text(state)
-    parameter.hashes = consume_raw_array(state)
-    parameter.hostname = consume_text(state)
-    parameter.bootstrap_ips = consume_text_array(state)
 
+def skip_raw_array(state):
+    spans = []
+    data = state.data
 
-def parse_doh_target(state, parameter):
-    parameter.options = consume_options(state)
-    parameter.hostname = consume_text(state)
-    parameter.path = consume_text(state)
+    done = state.remaining() <= 0
+    try:
+        while not done:
+            offset = state.offset
+            done = not data[offset] & 0x80
+            span = skip_raw(state, True)
+            if span is None:
+                if spans or data[offset]:
+                    state.canonical = False
+                break
+            spans.append(span)
+    except IndexError as e:
+        raise stamp_error(RawError, 'Unable to consume raw', e, state.offset)
+    return spans
+
+
+def decode_text(data, span):
+    start, end = span
+    if start == end:
+        return ""
+    try:
+        return codecs.decode(data[start:end], 'raw-unicode-escape')
+    except Exception as e:
+        raise stamp_error(TextError, 'Unable to consume text', e, start - 1, INVALID_TEXT)
+
+
+def decode_text_array(data, spans):
+    return [decode_text(data, span) for span in spans]
 
 
-def parse_dnscrypt_relay(state, parameter):
-    parameter.address = consume_text(state)
+def decode_raw(data, span):
+    return None if span is None else binascii.hexlify(data[span[0]:span[1]])
 
 
-def parse_doh_relay(state, parameter):
-    parameter.options = consume_options(state)
-    parameter.address = consume_text(state)
-    parameter.hashes = consume_raw_array(state)
-    parameter.hostname = consume_text(state)
-    parameter.path = consume_text(state)
-    parameter.bootstrap_ips = consume_text_array(state)
+def decode_raw_array(data, spans):
+    return [binascii.hexlify(data[start:end]) for start, end in spans]
 
 
-def parse(stamp):
-    parameter = Parameter()
+CONSUMERS = {
+    OPTIONS: consume_options,
+    TEXT: consume_text,
+    RAW: consume_raw,
+    TEXT_ARRAY: consume_text_array,
+    RAW_ARRAY: consume_raw_array,
+}
+
+
+def compile_decoder(schema):
+    steps = tuple((field.name, CONSUMERS[field.kind]) for field in schema.fields)
+
+    def decode(state, parameter):
+        try:
+            for name, consume in steps:
+                setattr(parameter, name, consume(state))
+        except StampError as e:
+            e.field = name
+            raise
 
-    state = create_state_for_stamp(stamp)
-    parameter.protocol = consume_protocol(state)
+    return decode
 
-    if parameter.protocol == Protocol.PLAIN:
-        parse_plain(state, parameter)
-    elif parameter.protocol == Protocol.DNSCRYPT:
-        parse_dnscrypt(state, parameter)
-    elif parameter.protocol == Protocol.DOH:
-        parse_doh(state, parameter)
-    elif parameter.protocol == Protocol.DOT:
-        parse_dot(state, parameter)
-    elif parameter.protocol == Protocol.DOQ:
-        parse_doq(state, parameter)
-    elif parameter.protocol == Protocol.DOH_TARGET:
-        parse_doh_target(state, parameter)
-    elif parameter.protocol == Protocol.DNSCRYPT_RELAY:
-        parse_dnscrypt_relay(state, parameter)
-    elif parameter.protocol == Protocol.DOH_RELAY:
-        parse_doh_relay(state, parameter)
 
+DECODERS = compile_schemas(compile_decoder)
+
+SKIPPERS = {
+    TEXT: (skip_text, decode_text),
+    RAW: (skip_raw, decode_raw),
+    TEXT_ARRAY: (skip_text_array, decode_text_array),
+    RAW_ARRAY: (skip_raw_array, decode_raw_array),
+}
+
+
+def compile_lazy_decoder(schema):
+    flags = FLAGS in schema.fields
+    steps = tuple((field.name,) + SKIPPERS[field.kind] for field in schema.fields if field is not FLAGS)
+
+    def decode(state, parameter):
+        if flags:
+            parameter.flags = consume_options(state)
+        try:
+            for name, skip, decode_field in steps:
+                parameter.defer(name, decode_field, skip(state))
+        except StampError as e:
+            e.field = name
+            raise
+
+    return decode
+
+
+LAZY_DECODERS = compile_schemas(compile_lazy_decoder)
+
+CHECKED = {
+    OPTIONS: (consume_options, consume_options, None, 'Unable to consume options'),
+    TEXT: (consume_text, skip_text, decode_text, 'Unable to consume text'),
+    RAW: (consume_raw, skip_raw, decode_raw, 'Unable to consume raw'),
+    TEXT_ARRAY: (consume_text, skip_text, decode_text_array, 'Unable to consume text'),
+    RAW_ARRAY: (consume_raw, skip_raw, decode_raw_array, 'Unable to consume raw'),
+}
+FIXED_LENGTHS = {OPTIONS: 8}
+ARRAYS = {TEXT_ARRAY, RAW_ARRAY}
+
+
+def compile_checked_decoder(schema, lazy):
+    steps = []
+    for field in schema.fields:
+        consume, skip, decode_field, message = CHECKED[field.kind]
+        steps.append((field.name, FIXED_LENGTHS.get(field.kind), field.kind in ARRAYS,
+                      consume if field is FLAGS or not lazy else skip,
+                      decode_field if field is not FLAGS and lazy else None, message))
+
+    def decode(state, parameter):
+        data = state.data
+        size = len(data)
+        try:
+            for name, length, array, consume, decode_field, message in steps:
+                offset = state.offset
+                if length is not None:
+                    if size - offset < length:
+                        return ParseFailure(TRUNCATED, name, offset, message)
+                    value = consume(state)
+                elif not array:
+                    if offset >= size or offset + 1 + (data[offset] & 0x7f) > size:
+                        return ParseFailure(TRUNCATED, name, offset, message)
+                    value = consume(state)
+                else:
+                    value = []
+                    more = offset < size
+                    while more:
+                        offset = state.offset
+                        if offset >= size or offset + 1 + (data[offset] & 0x7f) > size:
+                            return ParseFailure(TRUNCATED, name, offset, message)
+                        more = data[offset] & 0x80
+                        item = consume(state, True)
+                        if item is None:
+                            if value or data[offset]:
+                                state.canonical = False
+                            break
+                        value.append(item)
+                if decode_field is None:
+                    setattr(parameter, name, value)
+                else:
+                    parameter.defer(name, decode_field, value)
+        except StampError as e:
+            e.field = name
+            return e.failure()
+        return None
+
+    return decode
+
+
+CHECKED_DECODERS = compile_schemas(lambda schema: compile_checked_decoder(schema, False))
+CHECKED_LAZY_DECODERS = compile_schemas(lambda schema: compile_checked_decoder(schema, True))
+
+
+def check_modes(frozen, lazy):
+    if frozen and lazy:
+        raise ValueError('A parameter cannot be both frozen and lazy')
+
+
+def create_parameter(state, frozen, lazy):
+    check_modes(frozen, lazy)
+    return LazyParameter(state.data) if lazy else Parameter()
+
+
+def decode_parameter(state, parameter, frozen, lazy):
+    parameter.protocol = protocol = consume_protocol(state)
+    (LAZY_DECODERS if lazy else DECODERS)[protocol](state, parameter)
+    return parameter.freeze() if frozen else parameter
+
+
+def parse_state(state, frozen=False, lazy=False):
+    return decode_parameter(state, create_parameter(state, frozen, lazy), frozen, lazy)
+
+
+def parse_state_instrumented(recorder, state, frozen, lazy):
+    size = len(state.data)
+    try:
+        start = perf_counter()
+        parameter = create_parameter(state, frozen, lazy)
+        constructed = perf_counter()
+        parameter = decode_parameter(state, parameter, frozen, lazy)
+        decoded = perf_counter()
+    except Exception as e:
+        recorder.error('parse', e)
+        raise
+
+    recorder.count('parse', parameter.protocol, size)
+    recorder.time('parse.construct', constructed - start)
+    recorder.time('parse.decode', decoded - constructed)
+    return parameter
+
+
+def unpack_instrumented(recorder, unpack, state, value):
+    try:
+        start = perf_counter()
+        unpack(state, value)
+        recorder.time('parse.unpack', perf_counter() - start)
+        return state
+    except Exception as e:
+        recorder.error('parse', e)
+        raise
+
+
+def parse_stamp(state, stamp, frozen=False, lazy=False):
+    recorder = metrics.active.get()
+    if recorder is None:
+        parameter = parse_state(unpack_stamp(state, stamp), frozen, lazy)
+    else:
+        parameter = parse_state_instrumented(recorder, unpack_instrumented(recorder, unpack_stamp, state, stamp),
+                                             frozen, lazy)
+    if not frozen and not state.remaining() and state.canonical:
+        parameter.keep_stamp(stamp)
+    return parameter
+
+
+def parse_span(state, span, frozen=False, lazy=False):
+    recorder = metrics.active.get()
+    if recorder is None:
+        return parse_state(unpack_span(state, span), frozen, lazy)
+    return parse_state_instrumented(recorder, unpack_instrumented(recorder, unpack_span, state, span), frozen, lazy)
+
+
+def parse(stamp, frozen=False, lazy=False):
+    return parse_stamp(State(), stamp, frozen, lazy)
+
+
+def parse_many(stamps, yield_errors=False, frozen=False, lazy=False):
+    state = State()
+    for index, stamp in enumerate(stamps):
+        try:
+            parameter = parse_stamp(state, stamp, frozen, lazy)
+        except Exception as e:
+            if not yield_errors:
+                raise
+            yield index, e
+            continue
+        yield parameter
+
+
+def try_unpack_stamp(state, stamp):
+    if isinstance(stamp, str):
+        body = stamp.replace('sdns://', '')
+        if len(body) % 4 != 1 or not BASE64URL.fullmatch(body):
+            try:
+                state.reset(base64.urlsafe_b64decode(body + '==='))
+                return None
+            except Exception:
+                pass
+    return UNPACK_FAILURE
+
+
+def try_parse_stamp(state, stamp, frozen=False, lazy=False):
+    check_modes(frozen, lazy)
+
+    failure = try_unpack_stamp(state, stamp)
+    if failure is not None:
+        return failure
+
+    data = state.data
+    if not data:
+        return ParseFailure(TRUNCATED, 'protocol', 0, 'Unable to consume protocol')
+    protocol = PROTOCOLS.get(data[0])
+    if protocol is None:
+        return ParseFailure(UNKNOWN_PROTOCOL, 'protocol', 0, 'Unable to consume protocol')
+    state.offset = 1
+
+    parameter = create_parameter(state, frozen, lazy)
+    parameter.protocol = protocol
+    failure = (CHECKED_LAZY_DECODERS if lazy else CHECKED_DECODERS)[protocol](state, parameter)
+    if failure is not None:
+        return failure
+
+    if frozen:
+        return parameter.freeze()
+    if not state.remaining() and state.canonical:
+        parameter.keep_stamp(stamp)
     return parameter
+
+
+def try_parse(stamp, frozen=False, lazy=False):
+    return try_parse_stamp(State(), stamp, frozen, lazy)
+
+
+def try_parse_many(stamps, frozen=False, lazy=False):
+    state = State()
+    for stamp in stamps:
+        yield try_parse_stamp(state, stamp, frozen, lazy)
+
+
+def peek_state(state):
+    protocol = consume_protocol(state)
+    return Header(protocol, consume_options(state) if protocol in PROTOCOLS_WITH_OPTIONS else 0)
+
+
+def peek(stamp):
+    return peek_state(unpack_header(State(), stamp))
+
+
+def peek_many(stamps, yield_errors=False):
+    state = State()
+    for index, stamp in enumerate(stamps):
+        try:
+            header = peek_state(unpack_header(state, stamp))
+        except Exception as e:
+            if not yield_errors:
+                raise
+            yield index, e
+            continue
+        yield header
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+import mmap
+import os
+import re
+
+from dnsstamps.parser.parser import parse_span
+from dnsstamps.parser.state import State
+
+TOKEN = re.compile(rb'sdns://([A-Za-z0-9_-]*)=*')
+
+
+def scan_buffer(buffer, yield_errors=False, frozen=False, lazy=False):
+    state = State()
+    with memoryview(buffer) as view:
+        for match in TOKEN.finditer(buffer):
+            start, end = match.span(1)
+            try:
+                with view[start:end] as span:
+                    parameter = parse_span(state, span, frozen, lazy)
+            except Exception as e:
+                if not yield_errors:
+                    raise
+                yield match.start(), e
+                continue
+            yield parameter
+
+
+def scan_file(path, yield_errors=False, frozen=False, lazy=False):
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if hasattr(buffer, 'madvise'):
+                buffer.madvise(mmap.MADV_SEQUENTIAL)
+            yield from scan_buffer(buffer, yield_errors, frozen, lazy)
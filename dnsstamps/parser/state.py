@@ -2,14 +2,17 @@
 
 
 class State:
+    __slots__ = ('data', 'offset', 'canonical')
 
-    def __init__(self):
-        self._data = b''
+    def __init__(self, data=b''):
+        self.data = memoryview(data)
+        self.offset = 0
+        self.canonical = True
 
-    @property
-    def data(self):
-        return self._data
+    def reset(self, data):
+        self.data = memoryview(data)
+        self.offset = 0
+        self.canonical = True
 
-    @data.setter
-    def data(self, data):
-        self._data = data
+    def remaining(self):
+        return len(self.data) - self.offset
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+from collections import namedtuple
+
+from dnsstamps.error import entry_error
+from dnsstamps.parser.parser import parse_stamp
+from dnsstamps.parser.state import State
+
+Entry = namedtuple('Entry', ['name', 'description', 'stamp', 'line'])
+Resolver = namedtuple('Resolver', ['name', 'description', 'parameter'])
+
+
+def create_entries(name, description, stamps):
+    if name is None:
+        return []
+    description = '\n'.join(description).strip()
+    return [Entry(name, description, stamp, line) for stamp, line in stamps]
+
+
+def read_entries(lines):
+    name = None
+    description = []
+    stamps = []
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line.startswith('## '):
+            yield from create_entries(name, description, stamps)
+            name = line[3:].strip()
+            description = []
+            stamps = []
+        elif line.startswith('sdns://'):
+            stamps.append((line, number))
+        elif name is not None:
+            description.append(line)
+
+    yield from create_entries(name, description, stamps)
+
+
+def read_resolvers(lines, yield_errors=False, frozen=False, lazy=False):
+    state = State()
+    for entry in read_entries(lines):
+        try:
+            parameter = parse_stamp(state, entry.stamp, frozen, lazy)
+        except Exception as e:
+            if not yield_errors:
+                raise entry_error('Unable to parse stamp of <%s> on line %d' % (entry.name, entry.line), e, entry.name,
+                                  entry.line)
+            yield entry.line, e
+            continue
+        yield Resolver(entry.name, entry.description, parameter)
@@ -0,0 +1,44 @@
+from collections import namedtuple
+
+from dnsstamps import Protocol
+
+OPTIONS = 'options'
+TEXT = 'text'
+RAW = 'raw'
+TEXT_ARRAY = 'text_array'
+RAW_ARRAY = 'raw_array'
+
+Field = namedtuple('Field', ['name', 'kind', 'label'])
+Schema = namedtuple('Schema', ['protocol', 'title', 'fields', 'display'])
+
+FLAGS = Field('flags', OPTIONS, None)
+ADDRESS = Field('address', TEXT, 'IP Address')
+PUBLIC_KEY = Field('public_key', RAW, 'Public key')
+PROVIDER_NAME = Field('provider_name', TEXT, 'Provider name')
+HASHES = Field('hashes', RAW_ARRAY, 'Hashes')
+HOSTNAME = Field('hostname', TEXT, 'Hostname')
+PATH = Field('path', TEXT, 'Path')
+BOOTSTRAP_IPS = Field('bootstrap_ips', TEXT_ARRAY, 'Bootstrap IPs')
+
+SCHEMAS = [
+    Schema(Protocol.PLAIN, 'Plain DNS stamp',
+           (FLAGS, ADDRESS), None),
+    Schema(Protocol.DNSCRYPT, 'DNSCrypt DNS stamp',
+           (FLAGS, ADDRESS, PUBLIC_KEY, PROVIDER_NAME), None),
+    Schema(Protocol.DOH, 'DoH DNS stamp',
+           (FLAGS, ADDRESS, HASHES, HOSTNAME, PATH, BOOTSTRAP_IPS), None),
+    Schema(Protocol.DOT, 'DoT DNS stamp',
+           (FLAGS, ADDRESS, HASHES, HOSTNAME, BOOTSTRAP_IPS), (FLAGS, ADDRESS, HOSTNAME, HASHES, BOOTSTRAP_IPS)),
+    Schema(Protocol.DOQ, 'DoQ DNS stamp',
+           (FLAGS, ADDRESS, HASHES, HOSTNAME, BOOTSTRAP_IPS), (FLAGS, ADDRESS, HOSTNAME, HASHES, BOOTSTRAP_IPS)),
+    Schema(Protocol.DOH_TARGET, 'DoH Target DNS stamp',
+           (FLAGS, HOSTNAME, PATH), None),
+    Schema(Protocol.DNSCRYPT_RELAY, 'DNSCrypt DNS Relay Stamp',
+           (ADDRESS,), None),
+    Schema(Protocol.DOH_RELAY, 'DoH Relay DNS stamp',
+           (FLAGS, ADDRESS, HASHES, HOSTNAME, PATH, BOOTSTRAP_IPS), None),
+]
+
+
+def compile_schemas(compile_schema):
+    return {schema.protocol: compile_schema(schema) for schema in SCHEMAS}
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+
+from json.encoder import encode_basestring_ascii
+
+from dnsstamps import Option
+from dnsstamps import Parameter
+from dnsstamps import Protocol
+from dnsstamps.option import KNOWN_FLAGS
+from dnsstamps.option import flags_from_options
+from dnsstamps.option import options_from_flags
+from dnsstamps.parameter import PARAMETER_TYPES
+from dnsstamps.schema import OPTIONS
+from dnsstamps.schema import RAW
+from dnsstamps.schema import RAW_ARRAY
+from dnsstamps.schema import TEXT
+from dnsstamps.schema import TEXT_ARRAY
+from dnsstamps.schema import compile_schemas
+
+PROTOCOLS = {protocol.name: protocol for protocol in Protocol}
+DUMP_BATCH_SIZE = 1024
+
+OPTION_NAMES = [tuple(option.name for option in options_from_flags(flags)) for flags in range(KNOWN_FLAGS + 1)]
+OPTION_JSON = ['[%s],"flags":' % ','.join('"%s"' % name for name in names) for names in OPTION_NAMES]
+
+
+def option_names(flags):
+    return list(OPTION_NAMES[flags & KNOWN_FLAGS])
+
+
+def options_json(flags):
+    return OPTION_JSON[flags & KNOWN_FLAGS] + '%d' % flags
+
+
+def raw_text(raw):
+    if raw is None:
+        return ''
+    if isinstance(raw, str):
+        return raw.replace(":", "").strip().lower()
+    return raw.decode()
+
+
+def raw_json(raw):
+    return encode_basestring_ascii(raw_text(raw))
+
+
+def text_array_json(array):
+    return '[%s]' % ','.join(map(encode_basestring_ascii, array))
+
+
+def raw_array_json(array):
+    return '[%s]' % ','.join(map(raw_json, array))
+
+
+def compile_dict_encoder(schema):
+    protocol = schema.protocol.name
+    fields = tuple((field.name, field.kind) for field in schema.fields)
+
+    def encode(parameter):
+        values = {'protocol': protocol}
+        for name, kind in fields:
+            value = getattr(parameter, name)
+            if kind == OPTIONS:
+                values['options'] = option_names(value)
+                values['flags'] = value
+            elif kind == RAW:
+                values[name] = raw_text(value)
+            elif kind == RAW_ARRAY:
+                values[name] = [raw_text(raw) for raw in value]
+            elif kind == TEXT_ARRAY:
+                values[name] = list(value)
+            else:
+                values[name] = value
+        return values
+
+    return encode
+
+
+VALUE_ENCODERS = {
+    OPTIONS: options_json,
+    TEXT: encode_basestring_ascii,
+    RAW: raw_json,
+    TEXT_ARRAY: text_array_json,
+    RAW_ARRAY: raw_array_json,
+}
+
+
+def compile_json_encoder(schema):
+    prefix = '{"protocol":"%s"' % schema.protocol.name
+    steps = tuple((',"%s":' % ('options' if field.kind == OPTIONS else field.name), field.name,
+                   VALUE_ENCODERS[field.kind]) for field in schema.fields)
+
+    def encode(parameter):
+        parts = [prefix]
+        for key, name, encode_value in steps:
+            parts.append(key)
+            parts.append(encode_value(getattr(parameter, name)))
+        parts.append('}')
+        return ''.join(parts)
+
+    return encode
+
+
+def compile_dict_decoder(schema):
+    fields = tuple((field.name, field.kind) for field in schema.fields)
+
+    def decode(values, parameter):
+        for name, kind in fields:
+            if kind == OPTIONS:
+                if 'flags' in values:
+                    parameter.flags = values['flags']
+                else:
+                    parameter.flags = flags_from_options(Option[option] for option in values.get('options', ()))
+            elif name not in values:
+                continue
+            elif kind == RAW:
+                setattr(parameter, name, values[name].encode())
+            elif kind == RAW_ARRAY:
+                setattr(parameter, name, [raw.encode() for raw in values[name]])
+            elif kind == TEXT_ARRAY:
+                setattr(parameter, name, list(values[name]))
+            else:
+                setattr(parameter, name, values[name])
+
+    return decode
+
+
+DICT_ENCODERS = compile_schemas(compile_dict_encoder)
+JSON_ENCODERS = compile_schemas(compile_json_encoder)
+DICT_DECODERS = compile_schemas(compile_dict_decoder)
+
+
+def to_dict(parameter):
+    if not isinstance(parameter, PARAMETER_TYPES):
+        raise ValueError('Invalid parameter type %s' % type(parameter))
+
+    return DICT_ENCODERS[parameter.protocol](parameter)
+
+
+def from_dict(values, frozen=False):
+    try:
+        protocol = PROTOCOLS[values['protocol']]
+    except KeyError as e:
+        raise ValueError('Unrecognized protocol <%s>' % values.get('protocol'), e)
+
+    parameter = Parameter()
+    parameter.protocol = protocol
+    try:
+        DICT_DECODERS[protocol](values, parameter)
+    except Exception as e:
+        raise ValueError('Unable to read values', e)
+    return parameter.freeze() if frozen else parameter
+
+
+def to_json(parameter):
+    if not isinstance(parameter, PARAMETER_TYPES):
+        raise ValueError('Invalid parameter type %s' % type(parameter))
+
+    return JSON_ENCODERS[parameter.protocol](parameter)
+
+
+def dump_json(parameters, file):
+    lines = []
+    for parameter in parameters:
+        lines.append(to_json(parameter))
+        if len(lines) == DUMP_BATCH_SIZE:
+            lines.append('')
+            file.write('\n'.join(lines))
+            lines = []
+    if lines:
+        lines.append('')
+        file.write('\n'.join(lines))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+import codecs
+
+import numpy
+
+from dnsstamps import OptionFlag
+from dnsstamps import Protocol
+from dnsstamps.parser.parser import parse_state
+from dnsstamps.parser.parser import unpack_stamp
+from dnsstamps.parser.state import State
+
+COLUMNS = [
+    ('protocol', numpy.uint8),
+    ('flags', numpy.uint64),
+    ('payload_offset', numpy.uint64),
+    ('payload_length', numpy.uint32),
+    ('address_offset', numpy.uint64),
+    ('address_length', numpy.uint8),
+    ('hostname_offset', numpy.uint64),
+    ('hostname_length', numpy.uint8),
+    ('path_offset', numpy.uint64),
+    ('path_length', numpy.uint8),
+    ('hash_count', numpy.uint32),
+    ('bootstrap_ip_count', numpy.uint32),
+]
+TEXT_COLUMNS = ['address', 'hostname', 'path']
+
+
+class StampTable:
+
+    def __init__(self, heap, columns, errors=()):
+        self._heap = heap
+        self._columns = columns
+        self._errors = list(errors)
+
+    @classmethod
+    def from_stamps(cls, stamps, skip_errors=False):
+        heap = bytearray()
+        rows = {name: [] for name, _ in COLUMNS}
+        errors = []
+        state = State()
+
+        for index, stamp in enumerate(stamps):
+            try:
+                parameter = parse_state(unpack_stamp(state, stamp), lazy=True)
+            except Exception as e:
+                if not skip_errors:
+                    raise
+                errors.append((index, e))
+                continue
+
+            base = len(heap)
+            heap += state.data
+            rows['protocol'].append(parameter.protocol.value)
+            rows['flags'].append(parameter.flags)
+            rows['payload_offset'].append(base)
+            rows['payload_length'].append(len(state.data))
+
+            for name in TEXT_COLUMNS:
+                start, end = parameter.span(name) or (0, 0)
+                end = min(end, len(state.data))
+                rows[name + '_offset'].append(base + start if start < end else 0)
+                rows[name + '_length'].append(max(end - start, 0))
+
+            rows['hash_count'].append(len(parameter.span('hashes') or ()))
+            rows['bootstrap_ip_count'].append(len(parameter.span('bootstrap_ips') or ()))
+
+        columns = {name: numpy.array(rows[name], dtype=dtype) for name, dtype in COLUMNS}
+        return cls(bytes(heap), columns, errors)
+
+    @property
+    def errors(self):
+        return self._errors
+
+    def __len__(self):
+        return len(self._columns['protocol'])
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def where(self, protocols=None, flags=None, pinned=None, bootstrap_ips=None):
+        mask = numpy.ones(len(self), dtype=bool)
+        if protocols is not None:
+            mask &= numpy.isin(self['protocol'], [protocol.value for protocol in protocols])
+        if flags is not None:
+            flags = numpy.uint64(int(flags))
+            mask &= (self['flags'] & flags) == flags
+        if pinned is not None:
+            mask &= (self['hash_count'] > 0) == pinned
+        if bootstrap_ips is not None:
+            mask &= (self['bootstrap_ip_count'] > 0) == bootstrap_ips
+        return mask
+
+    def select(self, mask):
+        return StampTable(self._heap, {name: column[mask] for name, column in self._columns.items()})
+
+    def count_by_protocol(self):
+        counts = numpy.bincount(self['protocol'], minlength=256)
+        return {protocol: int(counts[protocol.value]) for protocol in Protocol if counts[protocol.value]}
+
+    def option_coverage(self):
+        return {flag: int(numpy.count_nonzero(self['flags'] & numpy.uint64(flag.value))) for flag in OptionFlag}
+
+    def pinned_count(self):
+        return int(numpy.count_nonzero(self['hash_count']))
+
+    def text(self, name, row):
+        offset = int(self._columns[name + '_offset'][row])
+        length = int(self._columns[name + '_length'][row])
+        return codecs.decode(self._heap[offset:offset + length], 'raw-unicode-escape') if length else ""
+
+    def payload(self, row):
+        offset = int(self['payload_offset'][row])
+        return memoryview(self._heap)[offset:offset + int(self['payload_length'][row])]
+
+    def to_parameter(self, row, frozen=False):
+        return parse_state(State(self.payload(row)), frozen)
+
+    def to_parameters(self, mask=None, frozen=False):
+        rows = range(len(self)) if mask is None else numpy.flatnonzero(mask)
+        return [self.to_parameter(row, frozen) for row in rows]
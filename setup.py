@@ -19,4 +19,7 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ],
     scripts=['bin/dnsstamp.py'],
+    extras_require={
+        'table': ['numpy'],
+    },
 )
@@ -2,6 +2,7 @@ import unittest
 
 import dnsstamps
 from dnsstamps import Option
+from dnsstamps import OptionFlag
 from dnsstamps import Parameter
 
 
@@ -115,6 +116,7 @@ class TestGenerator(unittest.TestCase):
             "sdns://AgUAAAAAAAAAAAAPZG9oLmV4YW1wbGUuY29tCi9kbnMtcXVlcnk",
             dnsstamps.create_doh(address, hashes, hostname, path, options),
             "Invalid stamp")
+        self.assertEqual([], hashes, "Hashes were modified")
 
     def test_generate_dot_stamp(self):
         address = "[fe80::6d6d:f72c:3ad:60b8]"
@@ -169,6 +171,7 @@ class TestGenerator(unittest.TestCase):
             "sdns://AwUAAAAAAAAAAAAPZG90LmV4YW1wbGUuY29t",
             dnsstamps.create_dot(address, hashes, hostname, options),
             "Invalid stamp")
+        self.assertEqual([], hashes, "Hashes were modified")
 
     def test_generate_doq_stamp(self):
         address = "[fe80::6d6d:f72c:3ad:60b8]"
@@ -223,6 +226,7 @@ class TestGenerator(unittest.TestCase):
             "sdns://BAUAAAAAAAAAAAAPZG9xLmV4YW1wbGUuY29t",
             dnsstamps.create_doq(address, hashes, hostname, options),
             "Invalid stamp")
+        self.assertEqual([], hashes, "Hashes were modified")
 
     def test_generate_doh_target_stamp(self):
         hostname = "doh-target.example.com"
@@ -318,3 +322,39 @@ class TestGenerator(unittest.TestCase):
             "sdns://hQIAAAAAAAAAAAAVZG9oLXJlbGF5LmV4YW1wbGUuY29tCi9kbnMtcXVlcnk",
             dnsstamps.create_doh_relay(address, hashes, hostname, path, options),
             "Invalid stamp")
+        self.assertEqual([], hashes, "Hashes were modified")
+
+    def test_generate_stamp_with_flags(self):
+        parameter = dnsstamps.prepare_plain("127.0.0.1")
+        parameter.flags = OptionFlag.DNSSEC | OptionFlag.NO_LOGS | OptionFlag.NO_FILTERS
+
+        self.assertEqual([Option.DNSSEC, Option.NO_LOGS, Option.NO_FILTERS], parameter.options, "Invalid options")
+        self.assertEqual("sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ", dnsstamps.build(parameter), "Invalid stamp")
+
+    def test_generate_stamp_with_options_as_flags(self):
+        self.assertEqual(
+            "sdns://AAUAAAAAAAAACTEyNy4wLjAuMQ",
+            dnsstamps.create_plain("127.0.0.1", OptionFlag.DNSSEC | OptionFlag.NO_FILTERS),
+            "Invalid stamp")
+
+    def test_build_into_buffer(self):
+        buffer = bytearray(b"previous payload")
+        parameter = dnsstamps.prepare_plain("127.0.0.1", [Option.DNSSEC, Option.NO_LOGS, Option.NO_FILTERS])
+
+        self.assertEqual("sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ", dnsstamps.build_into(buffer, parameter), "Invalid stamp")
+        self.assertEqual(b"\x00\x07\x00\x00\x00\x00\x00\x00\x00\x09127.0.0.1", bytes(buffer), "Invalid payload")
+
+        parameter = dnsstamps.prepare_dnscrypt_relay("127.0.0.1:443")
+        self.assertEqual("sdns://gQ0xMjcuMC4wLjE6NDQz", dnsstamps.build_into(buffer, parameter), "Invalid stamp")
+
+    def test_build_into_buffer_with_parsed_parameter(self):
+        buffer = bytearray()
+        dnsstamps.build_into(buffer, dnsstamps.prepare_dnscrypt_relay("127.0.0.1:443"))
+        parameter = dnsstamps.parse("sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ")
+
+        self.assertEqual("sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ", dnsstamps.build_into(buffer, parameter), "Invalid stamp")
+        self.assertEqual(b"\x00\x07\x00\x00\x00\x00\x00\x00\x00\x09127.0.0.1", bytes(buffer), "Invalid payload")
+
+    def test_build_into_buffer_with_invalid_parameter_type(self):
+        with self.assertRaises(ValueError):
+            dnsstamps.build_into(bytearray(), None)
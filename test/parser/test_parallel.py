@@ -0,0 +1,42 @@
+import unittest
+
+import dnsstamps
+from dnsstamps import Option
+from dnsstamps import Protocol
+
+STAMPS = [
+    "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AgAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQcxLjEuMS4x",
+    "sdns://gQ0xMjcuMC4wLjE6NDQz",
+]
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_parse_parallel_keeps_order(self):
+        stamps = STAMPS * 100
+        parameters = list(dnsstamps.parse_parallel(stamps, workers=2))
+
+        self.assertEqual([dnsstamps.parse(stamp).to_tuple() for stamp in stamps],
+                         [parameter.to_tuple() for parameter in parameters], "Invalid parameters")
+
+    def test_parse_parallel_restores_parameters(self):
+        parameter = next(dnsstamps.parse_parallel(iter(STAMPS[1:2]), workers=1))
+
+        self.assertEqual(Protocol.DOH, parameter.protocol, "Invalid protocol")
+        self.assertEqual([], parameter.options, "Invalid options")
+        self.assertEqual([b"3e1a1a0f6c53f3e97a492d57084b5b9807059ee057ab1505876fd83fda3db838"], parameter.hashes,
+                         "Invalid hashes")
+        self.assertEqual(["1.1.1.1"], parameter.bootstrap_ips, "Invalid bootstrap_ips")
+
+    def test_parse_parallel_with_invalid_stamp(self):
+        with self.assertRaises(Exception) as context:
+            list(dnsstamps.parse_parallel(STAMPS + ["sdns://abc123"], workers=2))
+        self.assertEqual("Unable to consume protocol", context.exception.args[0], "Invalid exception")
+
+    def test_parse_parallel_yielding_errors(self):
+        results = list(dnsstamps.parse_parallel(["sdns://abc123"] + STAMPS, workers=2, yield_errors=True))
+
+        self.assertEqual(0, results[0][0], "Invalid index")
+        self.assertEqual("Unable to consume protocol", results[0][1].args[0], "Invalid exception")
+        self.assertEqual([Option.DNSSEC, Option.NO_LOGS, Option.NO_FILTERS], results[1].options, "Invalid options")
@@ -1,7 +1,12 @@
+import base64
+import hashlib
 import unittest
+from random import Random
 
 import dnsstamps
+import dnsstamps.corpus
 from dnsstamps import Option
+from dnsstamps import OptionFlag
 from dnsstamps import Protocol
 
 
@@ -334,3 +339,194 @@ class TestParser(unittest.TestCase):
         self.assertEqual("doh-relay.example.com", parameter.hostname, "Invalid hostname")
         self.assertEqual("/dns-query", parameter.path, "Invalid path")
         self.assertEqual([], parameter.bootstrap_ips, "Invalid bootstrap_ips")
+
+    def test_parse_doh_stamp_with_many_hashes_and_bootstrap_ips(self):
+        hashes = [hashlib.sha256(b"%d" % i).hexdigest() for i in range(300)]
+        bootstrap_ips = ["10.0.%d.%d" % (i >> 8, i & 255) for i in range(300)]
+        parameter = dnsstamps.parse(
+            dnsstamps.create_doh("127.0.0.1", hashes, "doh.example.com", "/dns-query", bootstrap_ips=bootstrap_ips))
+
+        self.assertEqual([h.encode() for h in hashes], parameter.hashes, "Invalid hashes")
+        self.assertEqual("doh.example.com", parameter.hostname, "Invalid hostname")
+        self.assertEqual("/dns-query", parameter.path, "Invalid path")
+        self.assertEqual(bootstrap_ips, parameter.bootstrap_ips, "Invalid bootstrap_ips")
+
+    def test_parse_stamp_with_truncated_options(self):
+        with self.assertRaises(Exception) as context:
+            dnsstamps.parse("sdns://AgAAAA")
+        self.assertEqual("Unable to consume options", context.exception.args[0], "Invalid exception")
+
+    def test_parse_many_stamps(self):
+        parameters = list(dnsstamps.parse_many([
+            "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+            "sdns://BQAAAAAAAAAAFmRvaC10YXJnZXQuZXhhbXBsZS5jb20KL2Rucy1xdWVyeQ",
+            "sdns://gQ0xMjcuMC4wLjE6NDQz"]))
+
+        self.assertEqual([Protocol.PLAIN, Protocol.DOH_TARGET, Protocol.DNSCRYPT_RELAY],
+                         [parameter.protocol for parameter in parameters], "Invalid protocols")
+        self.assertEqual("127.0.0.1", parameters[0].address, "Invalid address")
+        self.assertEqual("doh-target.example.com", parameters[1].hostname, "Invalid hostname")
+        self.assertEqual("127.0.0.1:443", parameters[2].address, "Invalid address")
+
+    def test_parse_many_stamps_lazily(self):
+        stamps = iter(["sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ", "sdns://abc123"])
+        parameters = dnsstamps.parse_many(stamps)
+
+        self.assertEqual("127.0.0.1", next(parameters).address, "Invalid address")
+        with self.assertRaises(Exception) as context:
+            next(parameters)
+        self.assertEqual("Unable to consume protocol", context.exception.args[0], "Invalid exception")
+
+    def test_parse_many_stamps_yielding_errors(self):
+        results = list(dnsstamps.parse_many(
+            ["sdns://abc123xyz", "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ", "sdns://abc123"], yield_errors=True))
+
+        self.assertEqual(0, results[0][0], "Invalid index")
+        self.assertEqual("Unable to unpack stamp", results[0][1].args[0], "Invalid exception")
+        self.assertEqual("127.0.0.1", results[1].address, "Invalid address")
+        self.assertEqual(2, results[2][0], "Invalid index")
+        self.assertEqual("Unable to consume protocol", results[2][1].args[0], "Invalid exception")
+
+    def test_parse_stamp_options_as_flags(self):
+        parameter = dnsstamps.parse("sdns://AAUAAAAAAAAACTEyNy4wLjAuMQ")
+
+        self.assertEqual(OptionFlag.DNSSEC | OptionFlag.NO_FILTERS, parameter.flags, "Invalid flags")
+        self.assertTrue(parameter.flags & OptionFlag.DNSSEC, "Invalid flags")
+        self.assertFalse(parameter.flags & OptionFlag.NO_LOGS, "Invalid flags")
+
+    def test_parse_stamp_with_unknown_options(self):
+        parameter = dnsstamps.parse("sdns://ACEAAAAAAAABCTEyNy4wLjAuMQ")
+
+        self.assertEqual([Option.DNSSEC], parameter.options, "Invalid options")
+        self.assertEqual(0x0100000000000021, parameter.flags, "Invalid flags")
+        self.assertEqual("sdns://ACEAAAAAAAABCTEyNy4wLjAuMQ", dnsstamps.build(parameter), "Invalid stamp")
+
+    def test_peek_stamp(self):
+        header = dnsstamps.peek(
+            "sdns://AQUAAAAAAAAACTEyNy4wLjAuMSDLatxcKflVEAtlvxKU_laEV5qzSZzJeY8A0Bu1wamixxsyLmRuc2NyeXB0LWNlcnQuZXhhbXBsZS5jb20")
+
+        self.assertEqual(Protocol.DNSCRYPT, header.protocol, "Invalid protocol")
+        self.assertEqual(OptionFlag.DNSSEC | OptionFlag.NO_FILTERS, header.flags, "Invalid flags")
+
+    def test_peek_stamp_ignores_variable_length_fields(self):
+        header = dnsstamps.peek("sdns://AgYAAAAAAAAA_invalid_payload_")
+
+        self.assertEqual(Protocol.DOH, header.protocol, "Invalid protocol")
+        self.assertEqual(OptionFlag.NO_LOGS | OptionFlag.NO_FILTERS, header.flags, "Invalid flags")
+
+    def test_peek_stamp_without_options(self):
+        self.assertEqual(dnsstamps.Header(Protocol.DNSCRYPT_RELAY, 0), dnsstamps.peek("sdns://gQ0xMjcuMC4wLjE6NDQz"),
+                         "Invalid header")
+
+    def test_peek_stamp_with_invalid_protocol(self):
+        with self.assertRaises(Exception) as context:
+            dnsstamps.peek("sdns://abc123")
+        self.assertEqual("Unable to consume protocol", context.exception.args[0], "Invalid exception")
+
+    def test_peek_many_stamps(self):
+        results = list(dnsstamps.peek_many(
+            ["sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ", "sdns://abc123", "sdns://gQ0xMjcuMC4wLjE6NDQz"], yield_errors=True))
+
+        self.assertEqual(dnsstamps.Header(Protocol.PLAIN, 7), results[0], "Invalid header")
+        self.assertEqual(1, results[1][0], "Invalid index")
+        self.assertEqual(dnsstamps.Header(Protocol.DNSCRYPT_RELAY, 0), results[2], "Invalid header")
+
+    def test_parse_stamp_raises_typed_errors(self):
+        cases = [
+            ("sdns://abc123xyz", dnsstamps.error.UnpackError, ('invalid_base64', None, None)),
+            ("sdns://", dnsstamps.error.ProtocolError, ('truncated', 'protocol', 0)),
+            ("sdns://abc123", dnsstamps.error.ProtocolError, ('unknown_protocol', 'protocol', 0)),
+            ("sdns://AgAAAA", dnsstamps.error.OptionsError, ('truncated', 'flags', 1)),
+            ("sdns://AgAAAAAAAAAACTEyNy4wLjAuMaA", dnsstamps.error.RawError, ('truncated', 'hashes', 19)),
+            ("sdns://AAAAAAAAAAAAA1x1MQ", dnsstamps.error.TextError, ('invalid_text', 'address', 9)),
+        ]
+        for stamp, error_class, location in cases:
+            with self.assertRaises(error_class) as context:
+                dnsstamps.parse(stamp)
+            error = context.exception
+            self.assertIsInstance(error, dnsstamps.StampError, "Invalid exception")
+            self.assertEqual(location, (error.code, error.field, error.offset), "Invalid location")
+
+    def test_parse_stamp_with_truncated_array_raises_typed_error(self):
+        stamp = dnsstamps.create_dot("127.0.0.1", [], "dot.example.com", bootstrap_ips=["1.1.1.1"])
+        payload = bytearray(base64.urlsafe_b64decode(stamp[7:] + '==='))
+        payload[-8] |= 0x80
+        stamp = 'sdns://' + base64.urlsafe_b64encode(bytes(payload)).decode().rstrip('=')
+
+        for lazy in (False, True):
+            with self.assertRaises(dnsstamps.error.TextError) as context:
+                dnsstamps.parse(stamp, lazy=lazy)
+            self.assertEqual(('truncated', 'bootstrap_ips', len(payload)),
+                             (context.exception.code, context.exception.field, context.exception.offset),
+                             "Invalid location")
+
+    def test_try_parse_stamp(self):
+        stamp = "sdns://AgAAAAAAAAAACTEyNy4wLjAuMaA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OCDQskN3amwQ5EhbNOo-" \
+                "OzoGPzCJdw4Ep4yAh7fEnU-Y1g9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQ"
+        expected = dnsstamps.parse(stamp)
+
+        for frozen, lazy in ((False, False), (True, False), (False, True)):
+            parameter = dnsstamps.try_parse(stamp, frozen=frozen, lazy=lazy)
+            self.assertEqual(expected.hashes, list(parameter.hashes), "Invalid hashes")
+            self.assertEqual(expected.path, parameter.path, "Invalid path")
+        self.assertEqual(stamp, dnsstamps.try_parse(stamp).stamp, "Invalid stamp")
+
+    def test_try_parse_stamp_returns_failures(self):
+        self.assertEqual(
+            dnsstamps.ParseFailure('invalid_base64', None, None, 'Unable to unpack stamp'),
+            dnsstamps.try_parse("sdns://abc123xyz"), "Invalid failure")
+        self.assertEqual(
+            dnsstamps.ParseFailure('invalid_base64', None, None, 'Unable to unpack stamp'),
+            dnsstamps.try_parse(None), "Invalid failure")
+        self.assertEqual(
+            dnsstamps.ParseFailure('unknown_protocol', 'protocol', 0, 'Unable to consume protocol'),
+            dnsstamps.try_parse("sdns://abc123"), "Invalid failure")
+        self.assertEqual(
+            dnsstamps.ParseFailure('truncated', 'flags', 1, 'Unable to consume options'),
+            dnsstamps.try_parse("sdns://AgAAAA"), "Invalid failure")
+        self.assertEqual(
+            dnsstamps.ParseFailure('invalid_text', 'address', 9, 'Unable to consume text'),
+            dnsstamps.try_parse("sdns://AAAAAAAAAAAAA1x1MQ"), "Invalid failure")
+
+    def test_parse_stamp_with_truncated_field(self):
+        address = dnsstamps.create_plain("10.0.0.1")
+        hashes = dnsstamps.create_doh("127.0.0.1", ["aa" * 32], "doh.example.com", "/dns-query")
+        cases = [
+            (address, 9, dnsstamps.error.TextError, ('truncated', 'address', 9, 'Unable to consume text')),
+            (hashes, 21, dnsstamps.error.RawError, ('truncated', 'hashes', 19, 'Unable to consume raw')),
+        ]
+        for stamp, length, error_class, failure in cases:
+            payload = base64.urlsafe_b64decode(stamp[7:] + '===')[:length + 3]
+            stamp = 'sdns://' + base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+            for lazy in (False, True):
+                with self.assertRaises(error_class) as context:
+                    dnsstamps.parse(stamp, lazy=lazy)
+                self.assertEqual(failure, context.exception.failure(), "Invalid failure")
+                self.assertEqual(failure, dnsstamps.try_parse(stamp, lazy=lazy), "Invalid failure")
+
+    def test_try_parse_many_stamps(self):
+        results = list(dnsstamps.try_parse_many(
+            ["sdns://abc123xyz", "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ", "sdns://abc123"]))
+
+        self.assertEqual('invalid_base64', results[0].code, "Invalid code")
+        self.assertEqual("127.0.0.1", results[1].address, "Invalid address")
+        self.assertEqual('unknown_protocol', results[2].code, "Invalid code")
+
+    def test_try_parse_agrees_with_parse(self):
+        random = Random(25)
+        for stamp in dnsstamps.corpus.generate(50, seed=25):
+            payload = base64.urlsafe_b64decode(stamp[7:] + '===')
+            for _ in range(20):
+                mutated = bytearray(payload[:random.randrange(len(payload) + 1)])
+                if mutated:
+                    mutated[random.randrange(len(mutated))] ^= 1 << random.randrange(8)
+                mutated = 'sdns://' + base64.urlsafe_b64encode(bytes(mutated)).decode().rstrip('=')
+
+                try:
+                    expected = dnsstamps.parse(mutated).stamp
+                except dnsstamps.StampError as e:
+                    expected = e.failure()
+                result = dnsstamps.try_parse(mutated)
+                self.assertEqual(expected, result if isinstance(result, dnsstamps.ParseFailure) else result.stamp,
+                                 "Invalid result for <%s>" % mutated)
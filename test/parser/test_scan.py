@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+import dnsstamps
+from dnsstamps import Protocol
+
+CONTENT = b"""# resolvers
+plain sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ
+relay "sdns://gQ0xMjcuMC4wLjE6NDQz", broken sdns://AB
+padded sdns://gQ0xMjcuMC4wLjE6NDQz==
+"""
+
+
+class TestScan(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        with os.fdopen(handle, 'wb') as file:
+            file.write(CONTENT)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_scan_buffer(self):
+        parameters = list(dnsstamps.scan_buffer(CONTENT, yield_errors=True))
+
+        self.assertEqual(4, len(parameters), "Invalid count")
+        self.assertEqual(Protocol.PLAIN, parameters[0].protocol, "Invalid protocol")
+        self.assertEqual("127.0.0.1", parameters[0].address, "Invalid address")
+        self.assertEqual("127.0.0.1:443", parameters[1].address, "Invalid address")
+        self.assertEqual(CONTENT.index(b"sdns://AB"), parameters[2][0], "Invalid error offset")
+        self.assertEqual("127.0.0.1:443", parameters[3].address, "Invalid address")
+
+    def test_scan_file(self):
+        expected = [parameter.to_tuple() for parameter in dnsstamps.scan_buffer(CONTENT, yield_errors=True)
+                    if not isinstance(parameter, tuple)]
+        parameters = [parameter.to_tuple() for parameter in dnsstamps.scan_file(self.path, yield_errors=True)
+                      if not isinstance(parameter, tuple)]
+
+        self.assertEqual(expected, parameters, "Invalid parameters")
+
+    def test_scan_file_raises_on_invalid_stamp(self):
+        with self.assertRaises(Exception) as context:
+            list(dnsstamps.scan_file(self.path))
+        self.assertEqual("Unable to consume options", context.exception.args[0], "Invalid exception")
+
+    def test_scan_file_can_be_closed_early(self):
+        parameters = dnsstamps.scan_file(self.path, frozen=True)
+
+        self.assertEqual("127.0.0.1", next(parameters).address, "Invalid address")
+        parameters.close()
+
+    def test_scan_empty_file(self):
+        with open(self.path, 'wb'):
+            pass
+
+        self.assertEqual([], list(dnsstamps.scan_file(self.path)), "Invalid parameters")
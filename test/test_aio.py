@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+import dnsstamps
+from dnsstamps import aio
+
+STAMPS = [
+    "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AgAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQcxLjEuMS4x",
+    "sdns://gQ0xMjcuMC4wLjE6NDQz",
+]
+
+
+async def produce(items):
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+async def collect(results):
+    return [result async for result in results]
+
+
+class TestAio(unittest.IsolatedAsyncioTestCase):
+
+    async def test_parse_many(self):
+        stamps = STAMPS * 10
+        parameters = await collect(aio.parse_many(produce(stamps), chunk_size=4))
+
+        self.assertEqual([dnsstamps.parse(stamp).to_tuple() for stamp in stamps],
+                         [parameter.to_tuple() for parameter in parameters], "Invalid parameters")
+
+    async def test_parse_many_with_executor(self):
+        with ThreadPoolExecutor(2) as executor:
+            parameters = await collect(aio.parse_many(STAMPS * 10, frozen=True, chunk_size=4, executor=executor))
+
+        self.assertEqual([dnsstamps.parse(stamp, frozen=True) for stamp in STAMPS * 10], parameters,
+                         "Invalid parameters")
+
+    async def test_parse_many_lazy_with_process_executor(self):
+        with ProcessPoolExecutor(2) as executor:
+            parameters = await collect(aio.parse_many(STAMPS * 2, lazy=True, chunk_size=2, executor=executor))
+
+        self.assertEqual([dnsstamps.parse(stamp).to_tuple() for stamp in STAMPS * 2],
+                         [parameter.to_tuple() for parameter in parameters], "Invalid parameters")
+
+    async def test_parse_many_with_errors(self):
+        results = await collect(aio.parse_many(produce(STAMPS + ["sdns://abc123"] + STAMPS), yield_errors=True,
+                                               chunk_size=2))
+
+        self.assertEqual(7, len(results), "Invalid count")
+        self.assertEqual(3, results[3][0], "Invalid error index")
+        self.assertEqual("Unable to consume protocol", results[3][1].args[0], "Invalid exception")
+
+        with self.assertRaises(Exception) as context:
+            await collect(aio.parse_many(STAMPS + ["sdns://abc123"], chunk_size=2))
+        self.assertEqual("Unable to consume protocol", context.exception.args[0], "Invalid exception")
+
+    async def test_build_many(self):
+        parameters = [dnsstamps.parse(stamp) for stamp in STAMPS * 10]
+        stamps = await collect(aio.build_many(produce(parameters), chunk_size=4))
+
+        self.assertEqual([dnsstamps.build(parameter) for parameter in parameters], stamps, "Invalid stamps")
+
+    async def test_build_many_with_errors(self):
+        results = await collect(aio.build_many([dnsstamps.parse(STAMPS[0]), None], yield_errors=True))
+
+        self.assertEqual(STAMPS[0], results[0], "Invalid stamp")
+        self.assertEqual(1, results[1][0], "Invalid error index")
+
+    async def test_back_pressure(self):
+        consumed = []
+
+        async def source():
+            for stamp in STAMPS * 100:
+                consumed.append(stamp)
+                yield stamp
+
+        results = aio.parse_many(source(), chunk_size=10, queue_size=2)
+        await results.__anext__()
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        self.assertLessEqual(len(consumed), 40, "Input was not throttled")
+        await results.aclose()
@@ -0,0 +1,139 @@
+import unittest
+
+import dnsstamps
+from dnsstamps import Protocol
+
+PLAIN = "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ"
+DOH = "sdns://AgAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQcxLjEuMS4x"
+RELAY = "sdns://gQ0xMjcuMC4wLjE6NDQz"
+
+
+class FakeTimer:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestParseCache(unittest.TestCase):
+
+    def test_parse_with_cache(self):
+        cache = dnsstamps.ParseCache()
+        first = cache.parse(DOH)
+        second = cache.parse(DOH)
+
+        self.assertEqual(Protocol.DOH, second.protocol, "Invalid protocol")
+        self.assertEqual(dnsstamps.parse(DOH).to_tuple(), second.to_tuple(), "Invalid parameter")
+        self.assertIsNot(first, second, "Cached parameter is shared")
+
+        info = cache.cache_info()
+        self.assertEqual(1, info.hits, "Invalid hits")
+        self.assertEqual(1, info.misses, "Invalid misses")
+        self.assertEqual(1, info.currsize, "Invalid currsize")
+        self.assertGreater(info.bytes, len(DOH), "Invalid bytes")
+
+    def test_parse_with_cache_returns_copies(self):
+        cache = dnsstamps.ParseCache()
+        parameter = cache.parse(DOH)
+        parameter.hashes.append("d0b243776a6c10e4485b34ea3e3b3a063f3089770e04a78c8087b7c49d4f98d6")
+        parameter.address = "1.1.1.1"
+
+        parameter = cache.parse(DOH)
+        self.assertEqual([b"3e1a1a0f6c53f3e97a492d57084b5b9807059ee057ab1505876fd83fda3db838"], parameter.hashes,
+                         "Invalid hashes")
+        self.assertEqual("127.0.0.1", parameter.address, "Invalid address")
+
+    def test_parse_with_cache_evicts_least_recently_used(self):
+        cache = dnsstamps.ParseCache(maxsize=2)
+        cache.parse(PLAIN)
+        cache.parse(DOH)
+        cache.parse(PLAIN)
+        cache.parse(RELAY)
+        cache.parse(PLAIN)
+        cache.parse(DOH)
+
+        info = cache.cache_info()
+        self.assertEqual(2, info.hits, "Invalid hits")
+        self.assertEqual(4, info.misses, "Invalid misses")
+        self.assertEqual(2, info.evictions, "Invalid evictions")
+        self.assertEqual(2, info.currsize, "Invalid currsize")
+
+    def test_parse_with_cache_expires_entries(self):
+        timer = FakeTimer()
+        cache = dnsstamps.ParseCache(ttl=10, timer=timer)
+        cache.parse(PLAIN)
+        timer.now = 5
+        cache.parse(PLAIN)
+        timer.now = 10
+        cache.parse(PLAIN)
+
+        info = cache.cache_info()
+        self.assertEqual(1, info.hits, "Invalid hits")
+        self.assertEqual(2, info.misses, "Invalid misses")
+        self.assertEqual(1, info.evictions, "Invalid evictions")
+
+    def test_parse_with_cache_does_not_cache_errors(self):
+        cache = dnsstamps.ParseCache()
+        with self.assertRaises(Exception):
+            cache.parse("sdns://abc123")
+
+        info = cache.cache_info()
+        self.assertEqual(0, info.currsize, "Invalid currsize")
+        self.assertEqual(0, info.bytes, "Invalid bytes")
+
+    def test_clear_cache(self):
+        cache = dnsstamps.ParseCache()
+        cache.parse(PLAIN)
+        cache.clear()
+
+        self.assertEqual(dnsstamps.CacheInfo(0, 0, 0, 1024, 0, 0), cache.cache_info(), "Invalid cache info")
+
+    def test_cache_with_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            dnsstamps.ParseCache(maxsize=0)
+
+
+class TestBuildCache(unittest.TestCase):
+
+    def test_build_with_cache(self):
+        cache = dnsstamps.BuildCache()
+        parameter = dnsstamps.prepare_doh("127.0.0.1", [], "doh.example.com", "/dns-query")
+
+        self.assertEqual(dnsstamps.build(parameter), cache.build(parameter), "Invalid stamp")
+        self.assertEqual(dnsstamps.build(parameter), cache.build(parameter), "Invalid stamp")
+        self.assertEqual([], parameter.hashes, "Hashes were modified")
+
+        info = cache.cache_info()
+        self.assertEqual(1, info.hits, "Invalid hits")
+        self.assertEqual(1, info.misses, "Invalid misses")
+
+    def test_build_with_cache_is_keyed_on_content(self):
+        cache = dnsstamps.BuildCache()
+        first = dnsstamps.prepare_plain("127.0.0.1")
+        second = dnsstamps.prepare_plain("127.0.0.1")
+        cache.build(first)
+        cache.build(second)
+        second.address = "1.1.1.1"
+
+        self.assertEqual(dnsstamps.create_plain("1.1.1.1"), cache.build(second), "Invalid stamp")
+
+        info = cache.cache_info()
+        self.assertEqual(1, info.hits, "Invalid hits")
+        self.assertEqual(2, info.misses, "Invalid misses")
+
+    def test_build_with_cache_evicts_least_recently_used(self):
+        cache = dnsstamps.BuildCache(maxsize=1)
+        cache.build(dnsstamps.prepare_plain("127.0.0.1"))
+        cache.build(dnsstamps.prepare_plain("1.1.1.1"))
+
+        info = cache.cache_info()
+        self.assertEqual(1, info.evictions, "Invalid evictions")
+        self.assertEqual(1, info.currsize, "Invalid currsize")
+
+    def test_build_with_cache_and_invalid_parameter_type(self):
+        with self.assertRaises(ValueError) as context:
+            dnsstamps.BuildCache().build(None)
+        self.assertEqual("Invalid parameter type <class 'NoneType'>", str(context.exception),
+                         "Invalid parameter type")
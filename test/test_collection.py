@@ -0,0 +1,91 @@
+import unittest
+
+import dnsstamps
+from dnsstamps import OptionFlag
+from dnsstamps import Protocol
+from dnsstamps import StampCollection
+from dnsstamps.collection import AddressIs
+from dnsstamps.collection import HasBootstrapIps
+from dnsstamps.collection import HasOptions
+from dnsstamps.collection import HostnameIs
+from dnsstamps.collection import HostnameUnder
+from dnsstamps.collection import ProtocolIs
+from dnsstamps.collection import Where
+
+HASH = "3e1a1a0f6c53f3e97a492d57084b5b9807059ee057ab1505876fd83fda3db838"
+SECURE = [dnsstamps.Option.DNSSEC, dnsstamps.Option.NO_LOGS]
+
+
+class TestStampCollection(unittest.TestCase):
+
+    def setUp(self):
+        self.parameters = [
+            dnsstamps.prepare_doh("1.1.1.1", [HASH], "doh.example.net", "/dns-query", SECURE, ["9.9.9.9"]),
+            dnsstamps.prepare_doq("[fe80::1]:853", [HASH], "DoQ.Example.NET.", SECURE),
+            dnsstamps.prepare_dot("1.1.1.1:853", [HASH], "dot.example.net", SECURE, ["9.9.9.9"]),
+            dnsstamps.prepare_doh("8.8.8.8", [HASH], "doh.example.com", "/dns-query", [], ["9.9.9.9"]),
+            dnsstamps.prepare_plain("127.0.0.1", SECURE),
+        ]
+        self.collection = StampCollection(self.parameters)
+
+    def test_query_by_protocol(self):
+        self.assertEqual([self.parameters[0], self.parameters[3]], self.collection.query(ProtocolIs(Protocol.DOH)),
+                         "Invalid result")
+        self.assertEqual(3, self.collection.count(ProtocolIs(Protocol.DOH, Protocol.DOQ)), "Invalid count")
+
+    def test_query_by_options(self):
+        self.assertEqual(4, self.collection.count(HasOptions(OptionFlag.DNSSEC | OptionFlag.NO_LOGS)), "Invalid count")
+        self.assertEqual(0, self.collection.count(HasOptions(OptionFlag.NO_FILTERS)), "Invalid count")
+        self.assertEqual(5, self.collection.count(HasOptions(0)), "Invalid count")
+
+    def test_query_by_hostname(self):
+        self.assertEqual([self.parameters[1]], self.collection.query(HostnameIs("doq.example.net")), "Invalid result")
+        self.assertEqual([0, 1, 2], self.collection.query_keys(HostnameUnder("example.net")), "Invalid result")
+        self.assertEqual(4, self.collection.count(HostnameUnder("NET") | HostnameUnder("com")), "Invalid count")
+
+    def test_query_by_address(self):
+        self.assertEqual([0, 2], self.collection.query_keys(AddressIs("1.1.1.1")), "Invalid result")
+        self.assertEqual([1], self.collection.query_keys(AddressIs("[FE80::1]")), "Invalid result")
+
+    def test_query_with_composed_predicates(self):
+        predicate = (ProtocolIs(Protocol.DOH, Protocol.DOQ) &
+                     HasOptions(OptionFlag.DNSSEC | OptionFlag.NO_LOGS) &
+                     HostnameUnder("example.net") &
+                     HasBootstrapIps())
+
+        self.assertEqual([self.parameters[0]], self.collection.query(predicate), "Invalid result")
+        self.assertEqual([1, 2, 3, 4], self.collection.query_keys(~predicate), "Invalid result")
+        self.assertEqual([3], self.collection.query_keys(
+            HasBootstrapIps() & Where(lambda parameter: parameter.address.startswith("8."))), "Invalid result")
+
+    def test_add_and_remove_parameters(self):
+        key = self.collection.add(dnsstamps.prepare_doh("", [], "new.example.net", "/dns-query", SECURE))
+        self.assertEqual(5, key, "Invalid key")
+        self.assertEqual(4, self.collection.count(HostnameUnder("example.net")), "Invalid count")
+
+        self.assertIs(self.parameters[0], self.collection.remove(0), "Invalid parameter")
+        self.assertEqual([2, 3], self.collection.query_keys(HasBootstrapIps()), "Invalid result")
+        self.assertEqual([1, 2, 5], self.collection.query_keys(HostnameUnder("example.net")), "Invalid result")
+        self.assertEqual(5, len(self.collection), "Invalid length")
+
+        with self.assertRaises(KeyError):
+            self.collection.remove(0)
+
+    def test_keys_are_snapshots(self):
+        keys = self.collection.keys()
+        index = self.collection.index('hostname', "doh.example.net")
+        matches = ProtocolIs(Protocol.DOQ).keys(self.collection)
+        matches.add(0)
+        self.collection.remove(1)
+
+        self.assertEqual({0, 1, 2, 3, 4}, keys, "Invalid keys")
+        self.assertEqual({0}, index, "Invalid index")
+        self.assertEqual([], self.collection.query_keys(ProtocolIs(Protocol.DOQ)), "Invalid result")
+        self.assertEqual([0, 3], self.collection.query_keys(ProtocolIs(Protocol.DOH)), "Invalid result")
+
+    def test_collection_of_parsed_stamps(self):
+        collection = StampCollection(dnsstamps.parse_many([dnsstamps.build(p) for p in self.parameters], lazy=True))
+
+        self.assertEqual([0, 1, 2], collection.query_keys(HostnameUnder("example.net")), "Invalid result")
+        self.assertEqual([self.parameters[4].address], [p.address for p in collection.query(ProtocolIs(Protocol.PLAIN))],
+                         "Invalid result")
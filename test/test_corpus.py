@@ -0,0 +1,61 @@
+import io
+import unittest
+
+import dnsstamps
+from dnsstamps import Protocol
+from dnsstamps.corpus import DEFAULT_DISTRIBUTION
+from dnsstamps.corpus import CorpusGenerator
+from dnsstamps.corpus import generate
+from dnsstamps.corpus import parse_weights
+from dnsstamps.corpus import protocol_from_name
+from dnsstamps.corpus import write_corpus
+
+
+class TestCorpus(unittest.TestCase):
+
+    def test_generate_is_deterministic(self):
+        self.assertEqual(list(generate(200, seed=1)), list(generate(200, seed=1)), "Invalid stamps")
+        self.assertNotEqual(list(generate(200, seed=1)), list(generate(200, seed=2)), "Invalid stamps")
+
+    def test_generated_stamps_round_trip(self):
+        generator = CorpusGenerator(seed=3)
+        for parameter in generator.parameters(500):
+            stamp = dnsstamps.build(parameter)
+            self.assertEqual(stamp, dnsstamps.build(dnsstamps.parse(stamp)), "Invalid stamp")
+
+    def test_generate_follows_distribution(self):
+        distribution = DEFAULT_DISTRIBUTION._replace(protocols={Protocol.DOH: 1}, hashes={2: 1},
+                                                     bootstrap_ips={0: 1, 3: 1}, ports={443: 1}, ipv6=1.0, options=0)
+        parameters = list(dnsstamps.parse_many(generate(200, distribution=distribution)))
+
+        self.assertEqual({Protocol.DOH}, {parameter.protocol for parameter in parameters}, "Invalid protocols")
+        self.assertEqual({2}, {len(parameter.hashes) for parameter in parameters}, "Invalid hashes")
+        self.assertEqual({0, 3}, {len(parameter.bootstrap_ips) for parameter in parameters}, "Invalid bootstrap_ips")
+        self.assertTrue(all(parameter.address.startswith("[") and parameter.address.endswith("]:443")
+                            for parameter in parameters), "Invalid addresses")
+        self.assertEqual({0}, {parameter.flags for parameter in parameters}, "Invalid flags")
+
+    def test_generate_covers_every_protocol(self):
+        protocols = {parameter.protocol for parameter in dnsstamps.parse_many(generate(2000))}
+
+        self.assertEqual(set(Protocol), protocols, "Invalid protocols")
+
+    def test_write_corpus(self):
+        output = io.StringIO()
+        write_corpus(output, 1500, seed=5)
+
+        self.assertEqual(list(generate(1500, seed=5)), output.getvalue().splitlines(), "Invalid output")
+        self.assertTrue(output.getvalue().endswith("\n"), "Invalid output")
+
+    def test_parse_weights(self):
+        self.assertEqual({0: 3.0, 1: 1.0}, parse_weights("0=3, 1=1"), "Invalid weights")
+        self.assertEqual({Protocol.DOH: 2.0, Protocol.DNSCRYPT_RELAY: 1.0},
+                         parse_weights("doh=2,dnscrypt_relay=1", protocol_from_name), "Invalid weights")
+
+        with self.assertRaises(ValueError) as context:
+            parse_weights("foo=1", protocol_from_name)
+        self.assertEqual("Invalid weight <foo=1>", context.exception.args[0], "Invalid exception")
+
+    def test_empty_weights(self):
+        with self.assertRaises(ValueError):
+            CorpusGenerator(distribution=DEFAULT_DISTRIBUTION._replace(protocols={Protocol.DOH: 0}))
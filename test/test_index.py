@@ -0,0 +1,103 @@
+import hashlib
+import io
+import unittest
+
+import dnsstamps
+from dnsstamps import StampIndex
+from dnsstamps.index import Difference
+from dnsstamps.index import diff
+from dnsstamps.index import entries_by_digest
+from dnsstamps.index import entries_by_name
+from dnsstamps.resolvers import read_entries
+
+HASH = hashlib.sha256(b"old").hexdigest()
+ROTATED = hashlib.sha256(b"new").hexdigest()
+
+
+def doh(address, hashes, bootstrap_ips=()):
+    return dnsstamps.build(dnsstamps.prepare_doh(address, hashes, "doh.example.com", "/dns-query", [],
+                                                 list(bootstrap_ips)))
+
+
+class TestStampIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = StampIndex([
+            ("alpha", doh("1.1.1.1", [HASH])),
+            ("beta", doh("8.8.8.8", [HASH], ["9.9.9.9"])),
+            ("gamma", "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ"),
+        ])
+
+    def test_update_reports_changes(self):
+        changes = self.index.update([
+            ("alpha", doh("1.1.1.1", [ROTATED])),
+            ("beta", doh("8.8.8.8", [HASH], ["9.9.9.9"])),
+            ("delta", "sdns://gQ0xMjcuMC4wLjE6NDQz"),
+        ])
+
+        self.assertEqual(["delta"], list(changes.added), "Invalid added")
+        self.assertEqual(["gamma"], list(changes.removed), "Invalid removed")
+        self.assertEqual(["alpha"], list(changes.changed), "Invalid changed")
+        self.assertEqual(1, changes.unchanged, "Invalid unchanged")
+        self.assertEqual([Difference("hashes", (HASH.encode(),), (ROTATED.encode(),))],
+                         changes.changed["alpha"].differences, "Invalid differences")
+        self.assertEqual(["alpha", "beta", "delta"], sorted(self.index.keys()), "Invalid keys")
+        self.assertEqual([ROTATED.encode()], self.index["alpha"].hashes, "Invalid hashes")
+
+    def test_update_without_changes(self):
+        beta = self.index["beta"]
+        changes = self.index.update([
+            ("alpha", doh("1.1.1.1", [HASH])),
+            ("beta", doh("8.8.8.8", [HASH], ["9.9.9.9"])),
+            ("gamma", "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ"),
+        ])
+
+        self.assertFalse(changes, "Invalid changes")
+        self.assertEqual(3, changes.unchanged, "Invalid unchanged")
+        self.assertIs(beta, self.index["beta"], "Unchanged entry was parsed again")
+
+    def test_update_with_invalid_stamp(self):
+        with self.assertRaises(Exception) as context:
+            self.index.update([("alpha", "sdns://abc123")])
+        self.assertEqual("Unable to parse stamp of <alpha>", context.exception.args[0], "Invalid exception")
+        self.assertIsInstance(context.exception, dnsstamps.StampError, "Invalid exception")
+        self.assertEqual(("unknown_protocol", "protocol", 0, "alpha"),
+                         (context.exception.code, context.exception.field, context.exception.offset,
+                          context.exception.name), "Invalid location")
+        self.assertEqual(3, len(self.index), "Index was modified")
+
+        changes = self.index.update([("alpha", "sdns://abc123"), ("beta", doh("8.8.8.8", [HASH], ["9.9.9.9"]))],
+                                    skip_errors=True)
+        self.assertEqual(["alpha"], list(changes.errors), "Invalid errors")
+        self.assertEqual(["gamma"], list(changes.removed), "Invalid removed")
+        self.assertIn("alpha", self.index, "Last valid entry was dropped")
+
+    def test_keys_are_snapshots(self):
+        keys = self.index.keys()
+        items = self.index.items()
+        self.index.update([("delta", "sdns://gQ0xMjcuMC4wLjE6NDQz")])
+
+        self.assertEqual(["alpha", "beta", "gamma"], keys, "Invalid keys")
+        self.assertEqual(["alpha", "beta", "gamma"], [name for name, parameter in items], "Invalid items")
+        self.assertEqual(["delta"], self.index.keys(), "Invalid keys")
+
+    def test_diff(self):
+        old = dnsstamps.parse(doh("1.1.1.1", [HASH], ["9.9.9.9"]))
+        new = dnsstamps.parse(doh("1.1.1.1", [HASH], ["8.8.8.8"]), frozen=True)
+
+        self.assertEqual([Difference("bootstrap_ips", ("9.9.9.9",), ("8.8.8.8",))], diff(old, new),
+                         "Invalid differences")
+        self.assertEqual([], diff(old, old.freeze()), "Invalid differences")
+
+    def test_entries_by_name(self):
+        lines = io.StringIO("## alpha\n\nsdns://AAcAAAAAAAAACTEyNy4wLjAuMQ\nsdns://gQ0xMjcuMC4wLjE6NDQz\n")
+        keys = [key for key, _ in entries_by_name(read_entries(lines))]
+
+        self.assertEqual(["alpha", "alpha#2"], keys, "Invalid keys")
+
+    def test_entries_by_digest(self):
+        index = StampIndex(entries_by_digest(["sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ"]))
+        changes = index.update(entries_by_digest(["sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ", "sdns://gQ0xMjcuMC4wLjE6NDQz"]))
+
+        self.assertEqual(1, len(changes.added), "Invalid added")
+        self.assertEqual(1, changes.unchanged, "Invalid unchanged")
@@ -0,0 +1,110 @@
+import asyncio
+import base64
+import contextlib
+import io
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import dnsstamps
+from dnsstamps import aio
+from dnsstamps import metrics
+
+STAMPS = [
+    "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AgAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQcxLjEuMS4x",
+    "sdns://abc123",
+]
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_instrument_parse(self):
+        with metrics.instrument() as recorder:
+            list(dnsstamps.parse_many(STAMPS, yield_errors=True))
+        snapshot = recorder.snapshot()
+
+        self.assertEqual(3, snapshot["calls"]["parse"], "Invalid calls")
+        self.assertEqual(sum(len(base64.urlsafe_b64decode(stamp[7:] + "===")) for stamp in STAMPS[:2]),
+                         snapshot["bytes"]["parse"], "Invalid bytes")
+        self.assertEqual({"PLAIN": 1, "DOH": 1}, snapshot["protocols"]["parse"], "Invalid protocols")
+        self.assertEqual({"parse": {"Unable to consume protocol": 1}}, snapshot["errors"], "Invalid errors")
+        self.assertEqual({"parse.unpack", "parse.construct", "parse.decode"}, set(snapshot["seconds"]),
+                         "Invalid stages")
+
+    def test_instrument_build_and_format(self):
+        parameters = [dnsstamps.parse(stamp) for stamp in STAMPS[:2]]
+        parameters[1].path = "/resolve"
+
+        with metrics.instrument() as recorder:
+            stamps = [dnsstamps.build(parameter) for parameter in parameters]
+            with contextlib.redirect_stdout(io.StringIO()):
+                dnsstamps.format(parameters[0])
+        snapshot = recorder.snapshot()
+
+        self.assertEqual(STAMPS[0], stamps[0], "Invalid stamp")
+        self.assertEqual({"build": 3, "build.cached": 2, "format": 1}, snapshot["calls"], "Invalid calls")
+        self.assertEqual({"PLAIN": 2, "DOH": 1}, snapshot["protocols"]["build"], "Invalid protocols")
+        self.assertEqual({"build.encode", "build.base64", "format"}, set(snapshot["seconds"]), "Invalid stages")
+
+    def test_instrument_restores_previous_state(self):
+        self.assertIsNone(metrics.active.get(), "Invalid state")
+        outer = metrics.enable()
+        try:
+            with metrics.instrument() as inner:
+                dnsstamps.parse(STAMPS[0])
+            self.assertIs(outer, metrics.active.get(), "Invalid state")
+            self.assertEqual({}, metrics.snapshot()["calls"], "Invalid calls")
+            self.assertEqual(1, inner.snapshot()["calls"]["parse"], "Invalid calls")
+        finally:
+            metrics.disable()
+        self.assertEqual({}, metrics.snapshot(), "Invalid snapshot")
+
+    def test_instrument_is_isolated_per_thread(self):
+        entered = threading.Barrier(2)
+        exited = threading.Event()
+        snapshots = {}
+
+        def first():
+            with metrics.instrument() as recorder:
+                entered.wait()
+                dnsstamps.parse(STAMPS[0])
+            exited.set()
+            snapshots["first"] = recorder.snapshot()
+
+        def second():
+            with metrics.instrument() as recorder:
+                entered.wait()
+                exited.wait()
+                snapshots["active"] = metrics.active.get() is recorder
+                dnsstamps.parse(STAMPS[1])
+                dnsstamps.parse(STAMPS[1])
+            snapshots["second"] = recorder.snapshot()
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(snapshots["active"], "Invalid state")
+        self.assertEqual({"PLAIN": 1}, snapshots["first"]["protocols"]["parse"], "Invalid protocols")
+        self.assertEqual({"DOH": 2}, snapshots["second"]["protocols"]["parse"], "Invalid protocols")
+        self.assertIsNone(metrics.active.get(), "Invalid state")
+
+    def test_instrument_async_parse_in_threads(self):
+        async def parse_all():
+            return [parameter async for parameter in aio.parse_many(STAMPS, yield_errors=True, chunk_size=1,
+                                                                     executor=executor)]
+
+        with ThreadPoolExecutor(2) as executor, metrics.instrument() as recorder:
+            asyncio.run(parse_all())
+
+        self.assertEqual(3, recorder.snapshot()["calls"]["parse"], "Invalid calls")
+
+    def test_reset(self):
+        with metrics.instrument() as recorder:
+            dnsstamps.parse(STAMPS[0])
+            recorder.reset()
+
+        self.assertEqual({}, recorder.snapshot()["calls"], "Invalid calls")
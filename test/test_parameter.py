@@ -0,0 +1,268 @@
+import pickle
+import unittest
+
+import dnsstamps
+from dnsstamps import FrozenParameter
+from dnsstamps import LazyParameter
+from dnsstamps import Option
+from dnsstamps import OptionFlag
+from dnsstamps import Protocol
+from dnsstamps.error import TextError
+
+DOH = "sdns://AgYAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQ"
+
+
+class TestFrozenParameter(unittest.TestCase):
+
+    def test_parse_frozen_stamp(self):
+        parameter = dnsstamps.parse(DOH, frozen=True)
+
+        self.assertIsInstance(parameter, FrozenParameter, "Invalid type")
+        self.assertEqual(Protocol.DOH, parameter.protocol, "Invalid protocol")
+        self.assertEqual((Option.NO_LOGS, Option.NO_FILTERS), parameter.options, "Invalid options")
+        self.assertEqual("127.0.0.1", parameter.address, "Invalid address")
+        self.assertEqual((b"3e1a1a0f6c53f3e97a492d57084b5b9807059ee057ab1505876fd83fda3db838",), parameter.hashes,
+                         "Invalid hashes")
+        self.assertEqual("doh.example.com", parameter.hostname, "Invalid hostname")
+        self.assertEqual("/dns-query", parameter.path, "Invalid path")
+        self.assertEqual((), parameter.bootstrap_ips, "Invalid bootstrap_ips")
+
+    def test_frozen_parameter_is_immutable(self):
+        parameter = dnsstamps.parse(DOH, frozen=True)
+
+        with self.assertRaises(AttributeError):
+            parameter.address = "1.1.1.1"
+        with self.assertRaises(AttributeError):
+            parameter.extra = True
+
+    def test_frozen_parameter_is_hashable(self):
+        self.assertEqual(hash(dnsstamps.parse(DOH, frozen=True)), hash(dnsstamps.parse(DOH).freeze()),
+                         "Invalid hash")
+        self.assertEqual(1, len({dnsstamps.parse(DOH, frozen=True), dnsstamps.parse(DOH, frozen=True)}),
+                         "Invalid equality")
+
+    def test_freeze_and_thaw_parameter(self):
+        parameter = dnsstamps.parse(DOH)
+        thawed = parameter.freeze().thaw()
+
+        self.assertIsNot(parameter, thawed, "Parameter is shared")
+        self.assertEqual(parameter.to_tuple(), thawed.to_tuple(), "Invalid parameter")
+        self.assertEqual([Option.NO_LOGS, Option.NO_FILTERS], thawed.options, "Invalid options")
+        self.assertEqual([b"3e1a1a0f6c53f3e97a492d57084b5b9807059ee057ab1505876fd83fda3db838"], thawed.hashes,
+                         "Invalid hashes")
+
+    def test_frozen_parameter_defaults(self):
+        self.assertEqual(dnsstamps.Parameter().to_tuple(), FrozenParameter().to_tuple(), "Invalid defaults")
+
+    def test_build_frozen_parameter(self):
+        self.assertEqual(DOH, dnsstamps.build(dnsstamps.parse(DOH, frozen=True)), "Invalid stamp")
+
+    def test_format_frozen_parameter(self):
+        dnsstamps.format(dnsstamps.parse(DOH, frozen=True))
+
+    def test_parse_many_frozen_stamps(self):
+        parameters = list(dnsstamps.parse_many([DOH, DOH], frozen=True))
+
+        self.assertEqual([dnsstamps.parse(DOH, frozen=True)] * 2, parameters, "Invalid parameters")
+
+    def test_parse_frozen_stamp_with_cache(self):
+        cache = dnsstamps.ParseCache()
+
+        self.assertIs(cache.parse(DOH, frozen=True), cache.parse(DOH, frozen=True), "Frozen parameter is copied")
+
+
+class TestLazyParameter(unittest.TestCase):
+
+    def test_parse_lazy_stamp(self):
+        parameter = dnsstamps.parse(DOH, lazy=True)
+
+        self.assertIsInstance(parameter, LazyParameter, "Invalid type")
+        self.assertEqual(Protocol.DOH, parameter.protocol, "Invalid protocol")
+        self.assertEqual(OptionFlag.NO_LOGS | OptionFlag.NO_FILTERS, parameter.flags, "Invalid flags")
+        self.assertEqual(dnsstamps.parse(DOH).to_tuple(), parameter.to_tuple(), "Invalid parameter")
+
+    def test_parse_lazy_stamp_decodes_fields_on_access(self):
+        parameter = dnsstamps.parse(DOH, lazy=True)
+        self.assertEqual("", parameter.__dict__['_hostname'], "Hostname was decoded")
+
+        self.assertEqual("doh.example.com", parameter.hostname, "Invalid hostname")
+        self.assertEqual("doh.example.com", parameter.__dict__['_hostname'], "Hostname was not memoized")
+        self.assertEqual("", parameter.__dict__['_path'], "Path was decoded")
+
+    def test_pickle_lazy_stamp(self):
+        parameter = pickle.loads(pickle.dumps(dnsstamps.parse(DOH, lazy=True)))
+
+        self.assertEqual(dnsstamps.parse(DOH).to_tuple(), parameter.to_tuple(), "Invalid parameter")
+        self.assertEqual(DOH, dnsstamps.build(parameter), "Invalid stamp")
+
+    def test_lazy_decode_error(self):
+        parameter = dnsstamps.parse("sdns://AAAAAAAAAAAAA1x1MQ", lazy=True)
+
+        with self.assertRaises(TextError) as context:
+            parameter.address
+        self.assertEqual(('invalid_text', 'address', 9), context.exception.failure()[:3], "Invalid failure")
+
+    def test_set_lazy_field_before_access(self):
+        parameter = dnsstamps.parse(DOH, lazy=True)
+        parameter.hostname = "dns.example.com"
+
+        self.assertEqual("dns.example.com", parameter.hostname, "Invalid hostname")
+        self.assertEqual("/dns-query", parameter.path, "Invalid path")
+
+    def test_parse_lazy_stamps_of_every_protocol(self):
+        stamps = [
+            "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+            "sdns://AQUAAAAAAAAACTEyNy4wLjAuMSDLatxcKflVEAtlvxKU_laEV5qzSZzJeY8A0Bu1wamixxsyLmRuc2NyeXB0LWNlcnQuZXhhbXBsZS5jb20",
+            "sdns://AgAAAAAAAAAACTEyNy4wLjAuMaA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OCDQskN3amwQ5EhbNOo-OzoGPzCJdw4Ep4yAh7fEnU-Y1g9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQ",
+            "sdns://AwUAAAAAAAAAAAAPZG90LmV4YW1wbGUuY29t",
+            "sdns://BAAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb3EuZXhhbXBsZS5jb20HMS4xLjEuMQ",
+            "sdns://BQYAAAAAAAAAFmT2aC105HJnZXQuZXhhbXBsZS5j9m0KL2Rucy1xdWVyeQ",
+            "sdns://gQ0xMjcuMC4wLjE6NDQz",
+            "sdns://hQIAAAAAAAAAAAAVZG9oLXJlbGF5LmV4YW1wbGUuY29tCi9kbnMtcXVlcnk",
+        ]
+
+        for stamp in stamps:
+            self.assertEqual(dnsstamps.parse(stamp).to_tuple(), dnsstamps.parse(stamp, lazy=True).to_tuple(),
+                             "Invalid parameter for %s" % stamp)
+            self.assertEqual(stamp, dnsstamps.build(dnsstamps.parse(stamp, lazy=True)), "Invalid stamp")
+
+    def test_freeze_lazy_parameter(self):
+        self.assertEqual(dnsstamps.parse(DOH, frozen=True), dnsstamps.parse(DOH, lazy=True).freeze(),
+                         "Invalid parameter")
+
+    def test_format_lazy_parameter(self):
+        dnsstamps.format(dnsstamps.parse(DOH, lazy=True))
+
+    def test_parse_frozen_and_lazy_stamp(self):
+        with self.assertRaises(ValueError):
+            dnsstamps.parse(DOH, frozen=True, lazy=True)
+
+
+class TestOptions(unittest.TestCase):
+
+    def test_mutate_options_of_parsed_parameter(self):
+        parameter = dnsstamps.parse("sdns://ACEAAAAAAAABCTEyNy4wLjAuMQ")
+        parameter.options.append(Option.NO_LOGS)
+
+        self.assertTrue(parameter.dirty, "Invalid dirty")
+        self.assertEqual(0x0100000000000023, parameter.flags, "Invalid flags")
+        self.assertEqual([Option.DNSSEC, Option.NO_LOGS],
+                         dnsstamps.parse(dnsstamps.build(parameter)).options, "Invalid options")
+
+    def test_mutate_options_passed_to_prepare(self):
+        options = []
+        parameter = dnsstamps.prepare_plain("127.0.0.1", options)
+        options.append(Option.DNSSEC)
+        parameter.options.append(Option.NO_FILTERS)
+
+        self.assertEqual(OptionFlag.DNSSEC | OptionFlag.NO_FILTERS, parameter.flags, "Invalid flags")
+        self.assertEqual([Option.DNSSEC, Option.NO_FILTERS],
+                         dnsstamps.parse(dnsstamps.build(parameter)).options, "Invalid options")
+
+    def test_replace_options_of_parsed_parameter(self):
+        parameter = dnsstamps.parse("sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ")
+        options = parameter.options
+        options[0:2] = []
+        options += [Option.NO_LOGS]
+
+        self.assertEqual(OptionFlag.NO_LOGS | OptionFlag.NO_FILTERS, parameter.flags, "Invalid flags")
+
+    def test_extend_options_keeps_unknown_bits(self):
+        parameter = dnsstamps.parse("sdns://ACEAAAAAAAABCTEyNy4wLjAuMQ")
+        parameter.options += [Option.NO_LOGS]
+
+        self.assertEqual(0x0100000000000023, parameter.flags, "Invalid flags")
+        parameter.options = [Option.NO_FILTERS]
+        self.assertEqual(0x0100000000000024, parameter.flags, "Invalid flags")
+        self.assertEqual(0x0100000000000024, dnsstamps.parse(dnsstamps.build(parameter)).flags, "Invalid flags")
+
+    def test_mixed_option_list(self):
+        parameter = dnsstamps.prepare_plain("1.1.1.1", [OptionFlag.NO_FILTERS, Option.DNSSEC, 0x100])
+
+        self.assertEqual(0x105, parameter.flags, "Invalid flags")
+        self.assertEqual(OptionFlag.NO_FILTERS, dnsstamps.prepare_plain("1.1.1.1", [OptionFlag.NO_FILTERS]).flags,
+                         "Invalid flags")
+
+    def test_set_flags_after_options(self):
+        parameter = dnsstamps.prepare_plain("127.0.0.1", [Option.DNSSEC])
+        parameter.flags = OptionFlag.NO_LOGS
+
+        self.assertEqual([Option.NO_LOGS], parameter.options, "Invalid options")
+
+
+class TestSourceStamp(unittest.TestCase):
+
+    def test_parsed_parameter_keeps_stamp(self):
+        parameter = dnsstamps.parse(DOH)
+
+        self.assertFalse(parameter.dirty, "Invalid dirty")
+        self.assertIs(DOH, parameter.stamp, "Invalid stamp")
+        self.assertIs(DOH, dnsstamps.build(parameter), "Stamp was encoded again")
+
+    def test_setter_dirties_parameter(self):
+        parameter = dnsstamps.parse(DOH)
+        parameter.path = "/resolve"
+
+        self.assertTrue(parameter.dirty, "Invalid dirty")
+        self.assertIsNone(parameter.stamp, "Invalid stamp")
+        self.assertEqual("/resolve", dnsstamps.parse(dnsstamps.build(parameter)).path, "Invalid path")
+
+    def test_in_place_mutation_dirties_parameter(self):
+        parameter = dnsstamps.parse(DOH)
+        parameter.bootstrap_ips.append("1.1.1.1")
+
+        self.assertTrue(parameter.dirty, "Invalid dirty")
+        self.assertEqual(["1.1.1.1"], dnsstamps.parse(dnsstamps.build(parameter)).bootstrap_ips,
+                         "Invalid bootstrap_ips")
+
+    def test_lazy_parameter_keeps_stamp(self):
+        parameter = dnsstamps.parse(DOH, lazy=True)
+        parameter.load()
+
+        self.assertIs(DOH, dnsstamps.build(parameter), "Stamp was encoded again")
+        parameter.hashes.clear()
+        self.assertTrue(parameter.dirty, "Invalid dirty")
+
+    def test_lazy_parameter_keeps_mutation_of_loaded_array(self):
+        parameter = dnsstamps.parse(DOH, lazy=True)
+        parameter.hashes.append("aa" * 32)
+        parameter.bootstrap_ips
+
+        self.assertTrue(parameter.dirty, "Invalid dirty")
+        self.assertEqual(b"aa" * 32, dnsstamps.parse(dnsstamps.build(parameter)).hashes[-1], "Invalid hashes")
+
+    def test_prepared_and_frozen_parameters_are_encoded(self):
+        parameter = dnsstamps.prepare_plain("127.0.0.1")
+
+        self.assertTrue(parameter.dirty, "Invalid dirty")
+        self.assertEqual(DOH, dnsstamps.build(dnsstamps.parse(DOH, frozen=True)), "Invalid stamp")
+
+    def test_non_canonical_stamp_is_not_kept(self):
+        for stamp in [DOH + "==", DOH.replace("sdns://", ""), DOH[:7] + DOH[7:20] + "\n" + DOH[20:],
+                      DOH.replace("-", "+")]:
+            parameter = dnsstamps.parse(stamp)
+
+            self.assertTrue(parameter.dirty, "Invalid dirty")
+            self.assertEqual(DOH, dnsstamps.build(parameter), "Invalid stamp")
+
+    def test_stamp_with_non_zero_padding_bits_is_not_kept(self):
+        stamp = "sdns://AAcAAAAAAAAABzEuMS4xLjF"
+        parameter = dnsstamps.parse(stamp)
+
+        self.assertTrue(parameter.dirty, "Invalid dirty")
+        self.assertEqual("sdns://AAcAAAAAAAAABzEuMS4xLjE", dnsstamps.build(parameter), "Invalid stamp")
+        self.assertEqual(dnsstamps.build(parameter), dnsstamps.build(dnsstamps.parse(stamp, frozen=True)),
+                         "Invalid stamp")
+
+    def test_stamp_with_non_canonical_payload_is_not_kept(self):
+        stamps = [
+            "sdns://AAcAAAAAAAAAiTEyNy4wLjAuMQ",
+            "sdns://AAAAAAAAAAAABlx1MDA0MQ",
+            "sdns://AgAAAAAAAAAACTEyNy4wLjAuMYAPZG9oLmV4YW1wbGUuY29tCi9kbnMtcXVlcnk",
+        ]
+        for stamp in stamps:
+            expected = dnsstamps.build(dnsstamps.parse(stamp, frozen=True))
+            self.assertNotEqual(stamp, expected, "Invalid stamp")
+            for parameter in [dnsstamps.parse(stamp), dnsstamps.parse(stamp, lazy=True), dnsstamps.try_parse(stamp)]:
+                self.assertTrue(parameter.dirty, "Invalid dirty")
+                self.assertEqual(expected, dnsstamps.build(parameter), "Invalid stamp")
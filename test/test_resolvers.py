@@ -0,0 +1,68 @@
+import io
+import unittest
+
+import dnsstamps
+from dnsstamps import Protocol
+from dnsstamps.resolvers import read_entries
+
+RESOLVERS = """# public-resolvers
+
+This is an extensive list of public DNS resolvers.
+
+sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ
+
+## example-doh
+
+A DoH resolver.
+No logs, no filters.
+
+sdns://AgYAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQ
+sdns://abc123
+
+## example-relay
+
+A DNSCrypt relay.
+
+sdns://gQ0xMjcuMC4wLjE6NDQz
+"""
+
+
+class TestResolvers(unittest.TestCase):
+
+    def test_read_entries(self):
+        entries = list(read_entries(io.StringIO(RESOLVERS)))
+
+        self.assertEqual(["example-doh", "example-doh", "example-relay"], [entry.name for entry in entries],
+                         "Invalid names")
+        self.assertEqual("A DoH resolver.\nNo logs, no filters.", entries[0].description, "Invalid description")
+        self.assertEqual("sdns://abc123", entries[1].stamp, "Invalid stamp")
+        self.assertEqual([12, 13, 19], [entry.line for entry in entries], "Invalid lines")
+
+    def test_read_resolvers(self):
+        results = list(dnsstamps.read_resolvers(io.StringIO(RESOLVERS), yield_errors=True))
+
+        self.assertEqual("example-doh", results[0].name, "Invalid name")
+        self.assertEqual("A DoH resolver.\nNo logs, no filters.", results[0].description, "Invalid description")
+        self.assertEqual(Protocol.DOH, results[0].parameter.protocol, "Invalid protocol")
+        self.assertEqual(13, results[1][0], "Invalid error line")
+        self.assertEqual("Unable to consume protocol", results[1][1].args[0], "Invalid exception")
+        self.assertEqual("example-relay", results[2].name, "Invalid name")
+        self.assertEqual("127.0.0.1:443", results[2].parameter.address, "Invalid address")
+
+    def test_read_resolvers_with_invalid_stamp(self):
+        with self.assertRaises(Exception) as context:
+            list(dnsstamps.read_resolvers(RESOLVERS.splitlines()))
+        self.assertEqual("Unable to parse stamp of <example-doh> on line 13", context.exception.args[0],
+                         "Invalid exception")
+        self.assertIsInstance(context.exception, dnsstamps.StampError, "Invalid exception")
+        self.assertEqual(("unknown_protocol", "protocol", 0, "example-doh", 13),
+                         (context.exception.code, context.exception.field, context.exception.offset,
+                          context.exception.name, context.exception.line), "Invalid location")
+
+    def test_read_resolvers_lazily(self):
+        lines = iter(RESOLVERS.splitlines())
+        resolvers = dnsstamps.read_resolvers(lines, frozen=True)
+
+        self.assertEqual("example-doh", next(resolvers).name, "Invalid name")
+        self.assertEqual("", next(lines), "Invalid next line")
+        self.assertEqual("A DNSCrypt relay.", next(lines), "Lines were read ahead")
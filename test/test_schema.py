@@ -0,0 +1,22 @@
+import unittest
+
+from dnsstamps import Protocol
+from dnsstamps.formatter.formatter import PRINTERS
+from dnsstamps.generator.generator import ENCODERS
+from dnsstamps.parser.parser import DECODERS
+from dnsstamps.schema import SCHEMAS
+
+
+class TestSchema(unittest.TestCase):
+
+    def test_schema_covers_every_protocol(self):
+        self.assertEqual(list(Protocol), [schema.protocol for schema in SCHEMAS], "Invalid schemas")
+
+    def test_schema_is_compiled_for_every_protocol(self):
+        for codecs in (DECODERS, ENCODERS, PRINTERS):
+            self.assertEqual(set(Protocol), set(codecs), "Invalid codecs")
+
+    def test_schema_display_lists_every_field(self):
+        for schema in SCHEMAS:
+            if schema.display is not None:
+                self.assertEqual(set(schema.fields), set(schema.display), "Invalid display for %s" % schema.protocol)
@@ -0,0 +1,105 @@
+import io
+import json
+import unittest
+
+import dnsstamps
+from dnsstamps import Option
+from dnsstamps import Protocol
+
+STAMPS = [
+    "sdns://AAcAAAAAAAAACTEyNy4wLjAuMQ",
+    "sdns://AQAAAAAAAAAAGltmZTgwOjo2ZDZkOmY3MmM6M2FkOjYwYjhdIMtq3Fwp-VUQC2W_EpT-VoRXmrNJnMl5jwDQG7XBqaLHGzIuZG5zY3J5cHQtY2VydC5leGFtcGxlLmNvbQ",
+    "sdns://AgAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQcxLjEuMS4x",
+    "sdns://AwAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb3QuZXhhbXBsZS5jb20HMS4xLjEuMQ",
+    "sdns://BQEAAAAAAAAAD2RvaC5leGFtcGxlLmNvbQovZG5zLXF1ZXJ5",
+    "sdns://gQ0xMjcuMC4wLjE6NDQz",
+]
+
+
+class TestSerializer(unittest.TestCase):
+
+    def test_to_dict(self):
+        values = dnsstamps.to_dict(dnsstamps.parse(STAMPS[2]))
+
+        self.assertEqual({
+            "protocol": "DOH",
+            "options": [],
+            "flags": 0,
+            "address": "127.0.0.1",
+            "hashes": ["3e1a1a0f6c53f3e97a492d57084b5b9807059ee057ab1505876fd83fda3db838"],
+            "hostname": "doh.example.com",
+            "path": "/dns-query",
+            "bootstrap_ips": ["1.1.1.1"],
+        }, values, "Invalid values")
+
+    def test_to_dict_of_prepared_parameter(self):
+        parameter = dnsstamps.prepare_dnscrypt("127.0.0.1", "CB6A:DC5C:29F9:5510", "2.dnscrypt-cert.example.com",
+                                               [Option.DNSSEC])
+        values = dnsstamps.to_dict(parameter)
+
+        self.assertEqual(["DNSSEC"], values["options"], "Invalid options")
+        self.assertEqual(1, values["flags"], "Invalid flags")
+        self.assertEqual("cb6adc5c29f95510", values["public_key"], "Invalid public_key")
+
+    def test_round_trip(self):
+        for stamp in STAMPS:
+            for parameter in [dnsstamps.parse(stamp), dnsstamps.parse(stamp, frozen=True),
+                              dnsstamps.parse(stamp, lazy=True)]:
+                values = dnsstamps.to_dict(parameter)
+
+                self.assertEqual(values, json.loads(dnsstamps.to_json(parameter)), "Invalid json")
+                self.assertEqual(parameter.to_tuple(), dnsstamps.from_dict(values).to_tuple(), "Invalid parameter")
+                self.assertEqual(stamp, dnsstamps.build(dnsstamps.from_dict(values, frozen=True)), "Invalid stamp")
+
+    def test_serialize_empty_public_key(self):
+        stamp = dnsstamps.create_dnscrypt("127.0.0.1", "", "2.dnscrypt-cert.example.com")
+        parameter = dnsstamps.parse(stamp)
+
+        self.assertEqual("", dnsstamps.to_dict(parameter)["public_key"], "Invalid public_key")
+        self.assertEqual("", json.loads(dnsstamps.to_json(parameter))["public_key"], "Invalid public_key")
+        self.assertEqual(stamp, dnsstamps.build(dnsstamps.from_dict(dnsstamps.to_dict(parameter))), "Invalid stamp")
+
+    def test_serialize_unknown_option_bits(self):
+        parameter = dnsstamps.parse("sdns://ACEAAAAAAAABCTEyNy4wLjAuMQ")
+        values = json.loads(dnsstamps.to_json(parameter))
+
+        self.assertEqual(["DNSSEC"], values["options"], "Invalid options")
+        self.assertEqual(0x0100000000000021, values["flags"], "Invalid flags")
+        self.assertEqual(values, dnsstamps.to_dict(parameter), "Invalid values")
+
+    def test_from_dict_with_options(self):
+        parameter = dnsstamps.from_dict({"protocol": "PLAIN", "options": ["DNSSEC", "NO_FILTERS"]})
+
+        self.assertEqual(Protocol.PLAIN, parameter.protocol, "Invalid protocol")
+        self.assertEqual([Option.DNSSEC, Option.NO_FILTERS], parameter.options, "Invalid options")
+        self.assertEqual("127.0.0.1", parameter.address, "Invalid address")
+
+    def test_from_dict_with_invalid_values(self):
+        with self.assertRaises(ValueError) as context:
+            dnsstamps.from_dict({"protocol": "FOO"})
+        self.assertEqual("Unrecognized protocol <FOO>", context.exception.args[0], "Invalid exception")
+
+        with self.assertRaises(ValueError) as context:
+            dnsstamps.from_dict({"protocol": "PLAIN", "options": ["FOO"]})
+        self.assertEqual("Unable to read values", context.exception.args[0], "Invalid exception")
+
+    def test_to_json_escapes_text(self):
+        parameter = dnsstamps.prepare_doh_target('doh."example".com', "/dns-queryé")
+
+        self.assertEqual('doh."example".com', json.loads(dnsstamps.to_json(parameter))["hostname"], "Invalid hostname")
+        self.assertEqual("/dns-queryé", json.loads(dnsstamps.to_json(parameter))["path"], "Invalid path")
+
+    def test_dump_json(self):
+        parameters = [dnsstamps.parse(stamp) for stamp in STAMPS]
+        output = io.StringIO()
+        dnsstamps.dump_json(parameters, output)
+
+        self.assertEqual([dnsstamps.to_dict(parameter) for parameter in parameters],
+                         [json.loads(line) for line in output.getvalue().splitlines()], "Invalid output")
+        self.assertTrue(output.getvalue().endswith("}\n"), "Invalid output")
+
+    def test_to_dict_with_invalid_parameter(self):
+        with self.assertRaises(ValueError):
+            dnsstamps.to_dict(None)
+        with self.assertRaises(ValueError):
+            dnsstamps.to_json(None)
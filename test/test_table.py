@@ -0,0 +1,74 @@
+import unittest
+
+import dnsstamps
+from dnsstamps import OptionFlag
+from dnsstamps import Protocol
+
+try:
+    from dnsstamps.table import StampTable
+except ImportError:
+    StampTable = None
+
+STAMPS = [
+    "sdns://AgYAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb2guZXhhbXBsZS5jb20KL2Rucy1xdWVyeQ",
+    "sdns://AgUAAAAAAAAAAAAPZG9oLmV4YW1wbGUuY29tCi9kbnMtcXVlcnk",
+    "sdns://AwAAAAAAAAAACTEyNy4wLjAuMSA-GhoPbFPz6XpJLVcIS1uYBwWe4FerFQWHb9g_2j24OA9kb3QuZXhhbXBsZS5jb20HMS4xLjEuMQ",
+    "sdns://BQYAAAAAAAAAFmT2aC105HJnZXQuZXhhbXBsZS5j9m0KL2Rucy1xdWVyeQ",
+    "sdns://gQ0xMjcuMC4wLjE6NDQz",
+]
+
+
+@unittest.skipIf(StampTable is None, "numpy is not installed")
+class TestStampTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = StampTable.from_stamps(STAMPS)
+
+    def test_table_columns(self):
+        self.assertEqual(5, len(self.table), "Invalid length")
+        self.assertEqual([2, 2, 3, 5, 129], self.table["protocol"].tolist(), "Invalid protocols")
+        self.assertEqual([6, 5, 0, 6, 0], self.table["flags"].tolist(), "Invalid flags")
+        self.assertEqual([1, 0, 1, 0, 0], self.table["hash_count"].tolist(), "Invalid hash counts")
+        self.assertEqual([0, 0, 1, 0, 0], self.table["bootstrap_ip_count"].tolist(), "Invalid bootstrap ip counts")
+
+    def test_table_text(self):
+        self.assertEqual("127.0.0.1", self.table.text("address", 0), "Invalid address")
+        self.assertEqual("", self.table.text("address", 1), "Invalid address")
+        self.assertEqual("döh-tärget.example.cöm", self.table.text("hostname", 3), "Invalid hostname")
+        self.assertEqual("/dns-query", self.table.text("path", 3), "Invalid path")
+        self.assertEqual("127.0.0.1:443", self.table.text("address", 4), "Invalid address")
+
+    def test_table_aggregations(self):
+        self.assertEqual({Protocol.DOH: 2, Protocol.DOT: 1, Protocol.DOH_TARGET: 1, Protocol.DNSCRYPT_RELAY: 1},
+                         self.table.count_by_protocol(), "Invalid protocol counts")
+        self.assertEqual({OptionFlag.DNSSEC: 1, OptionFlag.NO_LOGS: 2, OptionFlag.NO_FILTERS: 3},
+                         self.table.option_coverage(), "Invalid option coverage")
+        self.assertEqual(2, self.table.pinned_count(), "Invalid pinned count")
+
+    def test_table_filters(self):
+        mask = self.table.where(protocols=[Protocol.DOH, Protocol.DOT], pinned=True)
+        self.assertEqual([True, False, True, False, False], mask.tolist(), "Invalid mask")
+
+        mask = self.table.where(flags=OptionFlag.NO_LOGS | OptionFlag.NO_FILTERS)
+        self.assertEqual([True, False, False, True, False], mask.tolist(), "Invalid mask")
+
+        selected = self.table.select(self.table.where(bootstrap_ips=True))
+        self.assertEqual(1, len(selected), "Invalid length")
+        self.assertEqual("dot.example.com", selected.text("hostname", 0), "Invalid hostname")
+
+    def test_table_to_parameters(self):
+        self.assertEqual([dnsstamps.parse(stamp).to_tuple() for stamp in STAMPS],
+                         [parameter.to_tuple() for parameter in self.table.to_parameters()], "Invalid parameters")
+        self.assertEqual(STAMPS[2:3], [dnsstamps.build(parameter) for parameter in
+                                       self.table.to_parameters(self.table.where(bootstrap_ips=True))],
+                         "Invalid stamps")
+        self.assertEqual(dnsstamps.parse(STAMPS[0], frozen=True), self.table.to_parameter(0, frozen=True),
+                         "Invalid parameter")
+
+    def test_table_with_invalid_stamps(self):
+        with self.assertRaises(Exception):
+            StampTable.from_stamps(["sdns://abc123"])
+
+        table = StampTable.from_stamps(["sdns://abc123"] + STAMPS, skip_errors=True)
+        self.assertEqual(5, len(table), "Invalid length")
+        self.assertEqual(0, table.errors[0][0], "Invalid error index")